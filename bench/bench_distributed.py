@@ -0,0 +1,121 @@
+"""
+Throughput scaling benchmark for coordinator/worker mode.
+
+Runs a mock proxy farm, a coordinator and 1..N worker processes on localhost
+and reports checks per second for each worker count. Worker count 0 runs
+the plain local checker on the same candidates, as the baseline a single
+worker has to match. A share of the proxies stall until the check timeout
+(`--stall-rate`), like most of a real list does.
+
+    python -m bench.bench_distributed --candidates 5000 --workers 0,1,2,4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+
+from bench.mock_proxy import MockProxyFarm
+from core.checker import check_proxies_generator
+from core.distributed import Coordinator, run_worker
+
+
+def _farm_main(port_queue, live_ratio, stall_rate):
+    async def serve():
+        farm = await MockProxyFarm(live_ratio=live_ratio, stall_rate=stall_rate).start()
+        port_queue.put(farm.port)
+        await asyncio.Event().wait()
+    asyncio.run(serve())
+
+
+def _worker_main(url, concurrency, lease_size):
+    asyncio.run(run_worker(url, concurrency=concurrency, lease_size=lease_size))
+
+
+async def run_local(farm_port, candidates, concurrency):
+    farm = MockProxyFarm()
+    farm.port = farm_port
+    checked = live = 0
+    start = time.perf_counter()
+    async for _, is_live, _ in check_proxies_generator(farm.candidates(candidates), concurrency):
+        checked += 1
+        live += is_live
+    return checked, live, time.perf_counter() - start, 0
+
+
+async def run_once(farm_port, candidates, workers, port, concurrency, lease_size):
+    if workers == 0:
+        return await run_local(farm_port, candidates, concurrency)
+
+    farm = MockProxyFarm()
+    farm.port = farm_port
+    proxies = farm.candidates(candidates)
+    coordinator = Coordinator(proxies, lease_size=lease_size)
+
+    procs = [
+        multiprocessing.Process(
+            target=_worker_main,
+            args=(f"http://127.0.0.1:{port}", concurrency, lease_size),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+
+    checked = live = 0
+    start = finished = time.perf_counter()
+    results = coordinator.run("127.0.0.1", port)
+    # Start serving before the workers come up so none of them exits early
+    first = asyncio.ensure_future(results.__anext__())
+    await asyncio.sleep(0.2)
+    for p in procs:
+        p.start()
+
+    try:
+        result = await first
+        while True:
+            checked += 1
+            live += result[1]
+            finished = time.perf_counter()
+            result = await results.__anext__()
+    except StopAsyncIteration:
+        pass
+    # The coordinator lingers briefly after the last result; don't count that
+    elapsed = finished - start - 0.2
+
+    for p in procs:
+        p.join(timeout=10)
+    return checked, live, elapsed, coordinator.reissued
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--workers", default="0,1,2,4", help="0 = local checker, no coordinator")
+    parser.add_argument("--concurrency", type=int, default=300, help="per worker")
+    parser.add_argument("--lease-size", type=int, default=200)
+    parser.add_argument("--live-ratio", type=float, default=0.5)
+    parser.add_argument("--stall-rate", type=float, default=0.05,
+                        help="share of requests that never answer (they cost a full timeout)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    port_queue = multiprocessing.Queue()
+    farm = multiprocessing.Process(target=_farm_main, args=(port_queue, args.live_ratio, args.stall_rate), daemon=True)
+    farm.start()
+    farm_port = port_queue.get(timeout=10)
+
+    print(f"{'workers':>8} {'checked':>8} {'live':>6} {'seconds':>8} {'checks/s':>9} {'speedup':>8}")
+    baseline = None
+    try:
+        for n in [int(w) for w in args.workers.split(",")]:
+            checked, live, elapsed, _ = asyncio.run(run_once(
+                farm_port, args.candidates, n, args.port, args.concurrency, args.lease_size
+            ))
+            rate = checked / elapsed
+            baseline = baseline or rate
+            print(f"{n:>8} {checked:>8} {live:>6} {elapsed:>8.2f} {rate:>9.0f} {rate / baseline:>7.2f}x")
+    finally:
+        farm.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measures false negatives and tail latency of the checker with and without
+hedged requests and retries, against the local mock proxy farm.
+
+Live proxies in the farm randomly drop connections, stall or answer slowly,
+so a single attempt marks some working proxies dead and slow judges hold a
+slot for up to TIMEOUT.
+
+    python -m bench.bench_hedging --candidates 2000 --drop-rate 0.05 --stall-rate 0.02
+"""
+import argparse
+import asyncio
+import time
+
+from bench.mock_proxy import MockProxyFarm
+from core import checker
+
+MODES = {
+    "single": dict(hedge=False, retry_budget=0),
+    "retry": dict(hedge=False, retry_budget=checker.RETRY_BUDGET),
+    "hedged": dict(hedge=True, retry_budget=checker.RETRY_BUDGET),
+}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def run_mode(farm: MockProxyFarm, proxies, concurrency: int, options: dict):
+    tracker = checker.LatencyTracker()
+    sem = asyncio.Semaphore(concurrency)
+    durations = []
+    false_negatives = 0
+
+    async def one(p):
+        nonlocal false_negatives
+        async with sem:
+            start = time.perf_counter()
+            _, is_live, _ = await checker.check_single_proxy(p, tracker, **options)
+            durations.append(time.perf_counter() - start)
+            if farm.is_live(p.ip) and not is_live:
+                false_negatives += 1
+
+    farm.requests = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(one(p) for p in proxies))
+    return {
+        "fn": false_negatives,
+        "p50": percentile(durations, 0.50),
+        "p99": percentile(durations, 0.99),
+        "wall": time.perf_counter() - start,
+        "requests": farm.requests,
+    }
+
+
+async def main_async(args):
+    checker.TIMEOUT = args.timeout
+    farm = await MockProxyFarm(
+        live_ratio=args.live_ratio,
+        drop_rate=args.drop_rate,
+        stall_rate=args.stall_rate,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+        seed=args.seed,
+    ).start("127.0.0.1" if args.candidates <= 254 else "0.0.0.0")
+    proxies = farm.candidates(args.candidates)
+    live_total = sum(farm.is_live(p.ip) for p in proxies)
+
+    print(f"{len(proxies)} candidates, {live_total} live, timeout {args.timeout}s\n")
+    print(f"{'mode':<8} {'false neg':>10} {'FN rate':>8} {'p50 s':>7} {'p99 s':>7} {'wall s':>7} {'req/proxy':>10}")
+    try:
+        for name in args.modes.split(","):
+            r = await run_mode(farm, proxies, args.concurrency, MODES[name])
+            print(f"{name:<8} {r['fn']:>10} {r['fn'] / max(live_total, 1):>8.1%} "
+                  f"{r['p50']:>7.2f} {r['p99']:>7.2f} {r['wall']:>7.1f} {r['requests'] / len(proxies):>10.2f}")
+    finally:
+        await farm.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hedged checks against the mock proxy farm.")
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=300)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--live-ratio", type=float, default=0.5)
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="live requests reset mid-flight")
+    parser.add_argument("--stall-rate", type=float, default=0.02, help="live requests that never answer")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="live requests answered after --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=4000)
+    parser.add_argument("--timeout", type=float, default=checker.TIMEOUT)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main_async(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Microbenchmarks and regression gate for the parsing paths in core/fetcher.py.
+
+Every parser is run over synthetic fixtures of the requested sizes (and over
+any recorded provider responses in --fixtures), measuring throughput and the
+peak memory allocated while parsing (tracemalloc). Runs fail (exit code 1)
+when a case parses a different number of entries, allocates more than
+--threshold above expectations, or (against a local baseline) gets slower
+by more than --threshold. A run with nothing to compare against fails too.
+
+The machine independent part (entry counts, peak bytes) of the default
+cases is committed in parsers_expected.json; fixtures are deterministic, so
+the gate works on any checkout. Timings are machine dependent, so those are
+only compared against a baseline recorded on the same machine:
+
+    python -m bench.bench_parsers                         # gate against the expectations
+    python -m bench.bench_parsers --save-baseline        # on the base commit, adds timings
+    python -m bench.bench_parsers --sizes 10000,1000000   # bigger fixtures
+    python -m bench.bench_parsers --record bench/fixtures # capture real responses
+    python -m bench.bench_parsers --save-expected         # after an intended change
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from core.models import Protocol
+from core import fetcher
+from core.validation import CandidateValidator
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(BENCH_DIR, ".parsers_baseline.json")
+EXPECTED_FILE = os.path.join(BENCH_DIR, "parsers_expected.json")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+DEFAULT_SIZES = (10_000, 100_000)
+DEFAULT_THRESHOLD = 0.20
+
+# Batch size used when replaying parsed proxies through dedupe_new
+DEDUPE_BATCH = 1000
+
+
+def _ips(n: int, seed: int = 1) -> List[Tuple[str, int]]:
+    rnd = random.Random(seed)
+    return [
+        (f"{rnd.randint(1, 223)}.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}.{rnd.randint(1, 254)}",
+         rnd.randint(1, 65535))
+        for _ in range(n)
+    ]
+
+
+def gen_plain(n: int) -> str:
+    lines = ["# proxy list"]
+    for i, (ip, port) in enumerate(_ips(n)):
+        lines.append(f"{ip}:{port}" if i % 10 else f"{ip} {port}")
+    return "\n".join(lines) + "\n"
+
+
+def gen_geonode(n: int) -> str:
+    protos = ["http", "socks4", "socks5"]
+    return json.dumps({"data": [
+        {"_id": str(i), "ip": ip, "port": str(port), "protocols": [protos[i % 3]],
+         "country": "US", "lastChecked": 1700000000, "speed": 100, "upTime": 99.5}
+        for i, (ip, port) in enumerate(_ips(n))
+    ], "total": n, "page": 1, "limit": n})
+
+
+def gen_proxyscrape(n: int) -> str:
+    protos = ["http", "socks4", "socks5"]
+    return json.dumps({"shown_records": n, "proxies": [
+        {"alive": True, "ip": ip, "port": port, "protocol": protos[i % 3],
+         "proxy": f"{protos[i % 3]}://{ip}:{port}", "timeout": 120.5}
+        for i, (ip, port) in enumerate(_ips(n))
+    ]})
+
+
+def gen_proxydb(n: int) -> str:
+    rows = []
+    protos = ["HTTP", "HTTPS", "SOCKS4", "SOCKS5"]
+    for i, (ip, port) in enumerate(_ips(n)):
+        rows.append(
+            "<tr>"
+            f'<td><a href="/{ip}/{port}">{ip}</a></td>'
+            f'<td><a href="/{ip}/{port}#p">{port}</a></td>'
+            f"<td>{protos[i % 4]}</td>"
+            '<td><abbr title="Anonymous">Anon</abbr></td>'
+            '<td><img src="/flags/us.png"> US</td>'
+            "<td>1.2s</td>"
+            "</tr>"
+        )
+    return ("<html><body><table class=\"table\"><thead><tr><th>Proxy</th></tr></thead><tbody>"
+            + "\n".join(rows) + "</tbody></table></body></html>")
+
+
+def gen_free_proxy_list(n: int) -> str:
+    rows = []
+    for i, (ip, port) in enumerate(_ips(n)):
+        version = "Socks5" if i % 2 else "Socks4"
+        rows.append(
+            f"<tr><td>{ip}</td><td>{port}</td><td>US</td><td class='hm'>United States</td>"
+            f"<td>{version}</td><td>Anonymous</td><td class='hm'>Yes</td><td class='hm'>1 min ago</td></tr>"
+        )
+    return ("<html><body><table class=\"table\"><thead><tr><th>IP Address</th></tr></thead><tbody>"
+            + "".join(rows) + "</tbody></table></body></html>")
+
+
+def gen_freeproxydb(n: int) -> str:
+    return "\n".join(f"socks://{ip}:{port}" for ip, port in _ips(n)) + "\n"
+
+
+def gen_lumiproxy(n: int) -> str:
+    return json.dumps({"code": 0, "data": {"total": n, "list": [
+        {"ip": ip, "port": port, "protocol": (1, 4, 8)[i % 3], "country_code": "US",
+         "anonymity": 2, "check_time": 1700000000}
+        for i, (ip, port) in enumerate(_ips(n))
+    ]}})
+
+
+def gen_parsed(n: int) -> List:
+    # Parsed up front, so the dedupe and validate cases measure only that step
+    return fetcher.parse_proxies_from_lines(gen_plain(n), Protocol.HTTP)
+
+
+def gen_duplicated(n: int) -> List:
+    # The same proxies twice: half of what dedupe sees are duplicates
+    proxies = gen_parsed(n)
+    return proxies + proxies
+
+
+def run_dedupe(proxies: List) -> List:
+    # Replays the proxies in provider-sized batches
+    seen = set()
+    new = []
+    for i in range(0, len(proxies), DEDUPE_BATCH):
+        new.extend(fetcher.dedupe_new(proxies[i:i + DEDUPE_BATCH], seen, "bench"))
+    return new
+
+
+def run_validate(proxies: List) -> List:
+    return CandidateValidator().filter(proxies, "bench")
+
+
+# name -> (fixture generator, parser). Fixtures are response text, except
+# for the post-parsing steps (dedupe, validate), which get parsed proxies.
+CASES: Dict[str, Tuple[Callable[[int], Any], Callable[[Any], List]]] = {
+    "plain": (gen_plain, lambda c: fetcher.parse_proxies_from_text(c, Protocol.HTTP)),
+    "geonode": (gen_geonode, lambda c: fetcher.parse_proxies_from_text(c, Protocol.HTTP)),
+    "proxyscrape": (gen_proxyscrape, lambda c: fetcher.parse_proxies_from_text(c, Protocol.HTTP)),
+    "proxydb": (gen_proxydb, fetcher.parse_proxydb_page),
+    "free_proxy_list": (gen_free_proxy_list, lambda c: fetcher.parse_free_proxy_list_page(c, "socks")),
+    "freeproxydb": (gen_freeproxydb, fetcher.parse_freeproxydb_lines),
+    "lumiproxy": (gen_lumiproxy, fetcher.parse_lumiproxy_json),
+    "dedupe": (gen_duplicated, run_dedupe),
+    "validate": (gen_parsed, run_validate),
+}
+
+# Where --record captures a real response for each parser
+RECORD_URLS = {
+    "plain": "https://raw.githubusercontent.com/TheSpeedX/SOCKS-List/master/http.txt",
+    "geonode": "https://proxylist.geonode.com/api/proxy-list?protocols=http&limit=500&page=1&sort_by=lastChecked&sort_type=desc",
+    "proxyscrape": "https://api.proxyscrape.com/v4/free-proxy-list/get?request=get_proxies&protocol=http&skip=0&proxy_format=protocolipport&format=json&limit=10000&timeout=20000",
+    "proxydb": "https://proxydb.net/?country=&offset=0",
+    "free_proxy_list": "https://free-proxy-list.net/tr/socks-proxy.html",
+    "freeproxydb": fetcher.FREEPROXYDB_BASE.format(page_index=1),
+    "lumiproxy": fetcher.LUMIPROXY_BASE.format(page=1),
+}
+
+
+def measure(parser: Callable[[Any], List], content: Any, repeat: int) -> Dict[str, float]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        # Keep collector pauses out of the timings
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            count = len(parser(content))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        parser(content)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "entries": count,
+        "seconds": best,
+        "rate": count / best if best > 0 else 0.0,
+        "mb_per_s": len(content) / best / 1e6 if best > 0 and isinstance(content, str) else 0.0,
+        "peak_bytes": peak,
+    }
+
+
+def load_fixtures(directory: str) -> List[Tuple[str, str, str]]:
+    """Returns (case, key, content) for recorded files named <case>[-anything].<ext>."""
+    fixtures = []
+    for name in sorted(os.listdir(directory)):
+        case = name.split(".", 1)[0].split("-", 1)[0]
+        if case not in RECORD_URLS:
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8", errors="replace") as f:
+            fixtures.append((case, f"{case}/recorded:{name}", f.read()))
+    return fixtures
+
+
+def record(directory: str):
+    import asyncio
+    import aiohttp
+
+    async def grab():
+        os.makedirs(directory, exist_ok=True)
+        async with aiohttp.ClientSession() as session:
+            for case, url in RECORD_URLS.items():
+                content = await fetcher.fetch_url(session, url)
+                status = f"{len(content)} bytes" if content else "FAILED"
+                if content:
+                    ext = "html" if case in ("proxydb", "free_proxy_list") else "txt"
+                    with open(os.path.join(directory, f"{case}.{ext}"), "w", encoding="utf-8") as f:
+                        f.write(content)
+                print(f"{case:<16} {status}")
+
+    asyncio.run(grab())
+
+
+def _load_json(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the fetcher parsers.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated synthetic fixture sizes (entries)")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma separated cases to run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case (best is kept)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR if os.path.isdir(FIXTURES_DIR) else None,
+                        help="directory of recorded responses to include (default: bench/fixtures, if present)")
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="download one real response per parser into DIR and exit")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--expected", default=EXPECTED_FILE)
+    parser.add_argument("--save-expected", action="store_true",
+                        help="update the committed entry counts and peak bytes from this run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed relative regression before failing (default: 0.20)")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record(args.record)
+        return 0
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    work = []
+    for size in [int(s) for s in args.sizes.split(",")]:
+        for case in cases:
+            work.append((case, f"{case}/{size}", CASES[case][0](size)))
+    if args.fixtures:
+        work.extend(f for f in load_fixtures(args.fixtures) if f[0] in cases)
+
+    results = {}
+    print(f"{'case':<40} {'entries':>9} {'ms':>9} {'entries/s':>11} {'MB/s':>7} {'peak KiB':>10}")
+    for case, key, content in work:
+        r = measure(CASES[case][1], content, args.repeat)
+        results[key] = r
+        print(f"{key:<40} {r['entries']:>9} {r['seconds'] * 1000:>9.1f} "
+              f"{r['rate']:>11.0f} {r['mb_per_s']:>7.1f} {r['peak_bytes'] / 1024:>10.0f}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    expected = _load_json(args.expected)
+    if args.save_expected:
+        expected.update(
+            {key: {"entries": r["entries"], "peak_bytes": r["peak_bytes"]} for key, r in results.items()}
+        )
+        with open(args.expected, "w", encoding="utf-8") as f:
+            json.dump(expected, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nExpectations saved to {args.expected}")
+        return 0
+
+    baseline = _load_json(args.baseline)
+    regressions = []
+    compared = 0
+    for key, r in results.items():
+        for name, base in (("expected", expected.get(key)), ("baseline", baseline.get(key))):
+            if not base:
+                continue
+            compared += 1
+            if base.get("rate") and r["rate"] < base["rate"] * (1 - args.threshold):
+                regressions.append(f"{key}: throughput {r['rate']:.0f}/s vs {name} {base['rate']:.0f}/s")
+            if base["peak_bytes"] and r["peak_bytes"] > base["peak_bytes"] * (1 + args.threshold):
+                regressions.append(f"{key}: peak {r['peak_bytes']} B vs {name} {base['peak_bytes']} B")
+            if r["entries"] != base["entries"]:
+                regressions.append(f"{key}: parsed {r['entries']} entries vs {name} {base['entries']}")
+
+    if not compared:
+        print(f"\nFAILED: nothing to compare against; no case has an entry in {args.expected} "
+              f"or {args.baseline}. Use --save-expected or --save-baseline first.")
+        return 1
+
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+
+    against = args.expected + (f" and {args.baseline}" if baseline else " (no timing baseline)")
+    print(f"\nOK: no regressions beyond {args.threshold:.0%} against {against}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Local mock proxy farm for benchmarks.
+
+A single asyncio server pretends to be many HTTP proxies: every address in
+127.0.0.0/8 reaches it (Linux routes the whole block to loopback), so
+candidates like 127.0.3.17:PORT are distinct proxies to the checker. The
+server answers CONNECT (and plain forward requests) itself, acting as the
+judge too, so no real network traffic is generated.
+
+Whether a proxy is live is a deterministic function of its address; dead
+ones reject every request with 403. Live proxies can additionally be made
+flaky per request with `drop_rate` (connection reset mid-request),
+`stall_rate` (never answers) and `slow_rate` (answers after `slow_ms`).
+"""
+import asyncio
+import random
+import zlib
+from typing import List
+
+from core.models import Proxy, Protocol
+
+_OK = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok"
+
+
+class MockProxyFarm:
+
+    def __init__(self, live_ratio: float = 0.3, latency_ms=(20, 200),
+                 drop_rate: float = 0.0, stall_rate: float = 0.0, slow_rate: float = 0.0,
+                 slow_ms: float = 3000.0, seed: int = 0):
+        self.live_ratio = live_ratio
+        self.latency_ms = latency_ms
+        self.drop_rate = drop_rate
+        self.stall_rate = stall_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.random = random.Random(seed)
+        self.port = 0
+        self.requests = 0
+        self._server = None
+
+    def is_live(self, ip: str) -> bool:
+        return zlib.crc32(ip.encode()) % 1000 < self.live_ratio * 1000
+
+    def candidates(self, count: int) -> List[Proxy]:
+        """Returns `count` distinct proxies that all point at this farm."""
+        proxies = []
+        for i in range(count):
+            block, host = divmod(i, 254)
+            ip = f"127.{(block >> 8) & 255}.{block & 255}.{host + 1}"
+            proxies.append(Proxy(ip=ip, port=self.port, protocol=Protocol.HTTP))
+        return proxies
+
+    async def start(self, host: str = "0.0.0.0", port: int = 0):
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=4096)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.requests += 1
+        ip = writer.get_extra_info("sockname")[0]
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not self.is_live(ip):
+                writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+                await writer.drain()
+                return
+
+            if head.startswith(b"CONNECT"):
+                writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+                await writer.drain()
+                await reader.readuntil(b"\r\n\r\n")
+
+            roll = self.random.random()
+            if roll < self.drop_rate:
+                writer.transport.abort()
+                return
+            roll -= self.drop_rate
+            if roll < self.stall_rate:
+                # Hold the connection open until the client gives up
+                await reader.read()
+                return
+            roll -= self.stall_rate
+            if roll < self.slow_rate:
+                await asyncio.sleep(self.slow_ms / 1000)
+            else:
+                await asyncio.sleep(self.random.uniform(*self.latency_ms) / 1000)
+
+            writer.write(_OK)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError,
+                asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
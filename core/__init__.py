@@ -0,0 +1,12 @@
+from .models import Proxy, Protocol
+from .api import iter_candidates, iter_checked, iter_live
+from .pool import LivePool
+
+__all__ = [
+    "Proxy",
+    "Protocol",
+    "iter_candidates",
+    "iter_checked",
+    "iter_live",
+    "LivePool",
+]
@@ -0,0 +1,107 @@
+"""
+Programmatic entry points for using ProxyGod from your own asyncio code.
+
+Nothing in here renders UI or writes export files:
+
+    from core import iter_live, LivePool
+
+    async with LivePool() as pool:
+        async for proxy, latency in iter_live(target_live=200):
+            pool.add(proxy, latency)
+        proxy = pool.acquire()
+        ...
+        pool.release(proxy, ok=True)
+"""
+import asyncio
+import errno
+import os
+from contextlib import aclosing
+from typing import AsyncIterable, AsyncIterator, Iterable, Optional, Tuple, Union
+from .models import Proxy
+from .fetcher import fetch_all_proxies
+from .checker import check_proxies_generator
+from .validation import CandidateValidator
+
+DEFAULT_PROVIDERS = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "providers.md"
+)
+
+
+async def iter_candidates(
+    providers_file: str = DEFAULT_PROVIDERS,
+    advanced_url: Optional[str] = None,
+    validator: Optional[CandidateValidator] = None,
+    stats_file: Optional[str] = None,
+) -> AsyncIterator[Proxy]:
+    """
+    Yields unique scraped proxies as soon as each provider returns them.
+    Pass a CandidateValidator to add blocklists or read reject counts.
+    Nothing is written to disk unless a `stats_file` path is given.
+    Raises FileNotFoundError if `providers_file` doesn't exist.
+    """
+    # fetch_all_proxies only logs a missing file, for the CLI's sake
+    if not os.path.isfile(providers_file):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), providers_file)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    _done = object()
+
+    async def run():
+        try:
+            await fetch_all_proxies(
+                providers_file,
+                advanced_url,
+                show_progress=False,
+                on_new_proxies=lambda batch: queue.put_nowait(batch),
+                validator=validator,
+                stats_file=stats_file,
+            )
+        finally:
+            queue.put_nowait(_done)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            batch = await queue.get()
+            if batch is _done:
+                break
+            for p in batch:
+                yield p
+        # Surface scraping errors to the caller
+        await task
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def iter_checked(
+    proxies: Union[Iterable[Proxy], AsyncIterable[Proxy]],
+    concurrency: int = 300,
+    target_live: Optional[int] = None,
+) -> AsyncIterator[Tuple[Proxy, bool, float]]:
+    """
+    Checks the given proxies (a list, or an async iterator such as
+    iter_candidates()), yielding (proxy, is_live, latency_ms) as they finish.
+    """
+    # Closed explicitly, so breaking out early stops the checkers right away
+    async with aclosing(check_proxies_generator(proxies, concurrency, target_live)) as results:
+        async for result in results:
+            yield result
+
+
+async def iter_live(
+    providers_file: str = DEFAULT_PROVIDERS,
+    advanced_url: Optional[str] = None,
+    concurrency: int = 300,
+    target_live: Optional[int] = None,
+) -> AsyncIterator[Tuple[Proxy, float]]:
+    """
+    Scrapes all providers and yields (proxy, latency_ms) for live ones.
+    Candidates are checked as they are scraped, so the first live proxies
+    arrive long before slow, paginated providers are done.
+    """
+    async with aclosing(iter_candidates(providers_file, advanced_url)) as candidates:
+        async with aclosing(check_proxies_generator(candidates, concurrency, target_live)) as results:
+            async for proxy, is_live, latency in results:
+                if is_live:
+                    yield proxy, latency
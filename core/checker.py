@@ -2,6 +2,7 @@ import asyncio
 import time
 import aiohttp
 import random
+from collections import deque
 from aiohttp_socks import ProxyConnector
 from .models import Proxy, Protocol
 
@@ -14,39 +15,226 @@ JUDGES = [
 ]
 TIMEOUT = 10
 
-async def check_single_proxy(proxy: Proxy) -> tuple[Proxy, bool, float]:
+# Hedging: if a check hasn't answered after roughly the current p90 latency,
+# a second request goes out through the same proxy to a different judge and
+# the first success wins. Until enough samples exist, HEDGE_DEFAULT is used.
+HEDGE_QUANTILE = 0.9
+HEDGE_DEFAULT = 3.0
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 500
+# The p90 is re-computed after this many new samples, not on every call
+HEDGE_RECOMPUTE_EVERY = 25
+
+# Extra attempts allowed per proxy after an ambiguous failure (connection
+# reset, dropped response). Clear refusals are never retried.
+RETRY_BUDGET = 1
+
+# Errors that may be a dropped packet rather than a dead proxy
+_AMBIGUOUS_ERRORS = (
+    ConnectionResetError,
+    BrokenPipeError,
+    ConnectionAbortedError,
+    asyncio.IncompleteReadError,
+    aiohttp.ServerDisconnectedError,
+    aiohttp.ClientPayloadError,
+)
+
+def _default_hedge_delay() -> float:
+    # Clamped like measured delays, so the hedge always has time left to run
+    return min(max(HEDGE_DEFAULT, HEDGE_MIN_DELAY), TIMEOUT / 2)
+
+class LatencyTracker:
+    """Rolling window of successful check latencies, used to pick the hedge delay."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._delay = _default_hedge_delay()
+        self._dirty = 0
+        self._measured = False
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self._dirty += 1
+
+    def hedge_delay(self) -> float:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return _default_hedge_delay()
+        # Re-sorting the window on every call would dominate at high concurrency
+        if not self._measured or self._dirty >= HEDGE_RECOMPUTE_EVERY:
+            ordered = sorted(self.samples)
+            p = ordered[min(int(len(ordered) * HEDGE_QUANTILE), len(ordered) - 1)]
+            self._delay = min(max(p, HEDGE_MIN_DELAY), TIMEOUT / 2)
+            self._dirty = 0
+            self._measured = True
+        return self._delay
+
+def _is_ambiguous(exc: BaseException) -> bool:
+    """True for failures worth retrying: resets and drops, not refusals or timeouts."""
+    seen = 0
+    while exc is not None and seen < 5:
+        if isinstance(exc, ConnectionRefusedError):
+            return False
+        if isinstance(exc, _AMBIGUOUS_ERRORS):
+            return True
+        exc = exc.__cause__ or exc.__context__
+        seen += 1
+    return False
+
+async def _attempt(proxy: Proxy, target_url: str, timeout: float) -> float:
+    """One request through the proxy. Returns its latency in seconds, raises on failure."""
+    # aiohttp treats a timeout <= 0 as no timeout at all
+    if timeout <= 0:
+        raise asyncio.TimeoutError()
+    start_time = time.time()
+    connector = ProxyConnector.from_url(proxy.to_url())
+    
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        async with session.get(target_url, ssl=False) as response:
+            if response.status != 200:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status
+                )
+            return time.time() - start_time
+
+async def check_single_proxy(
+    proxy: Proxy,
+    tracker: LatencyTracker | None = None,
+    retry_budget: int = RETRY_BUDGET,
+    hedge: bool = True,
+) -> tuple[Proxy, bool, float]:
     """
     Checks a single proxy.
     Returns: (Proxy, is_live, latency_ms)
     """
     start_time = time.time()
-    # Randomly select a judge for each request to distribute load
-    target_url = random.choice(JUDGES)
-    
+    deadline = start_time + TIMEOUT
+    # Each attempt goes to a different judge, in random order to distribute load
+    judges = random.sample(JUDGES, len(JUDGES))
+    next_judge = 0
+
+    def launch():
+        nonlocal next_judge
+        target_url = judges[next_judge % len(judges)]
+        next_judge += 1
+        return asyncio.ensure_future(_attempt(proxy, target_url, deadline - time.time()))
+
+    pending = {launch()}
+    hedge_at = start_time + (tracker.hedge_delay() if tracker else _default_hedge_delay())
+    hedged = not hedge
+
     try:
-        connector = ProxyConnector.from_url(proxy.to_url())
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as session:
-            async with session.get(target_url, ssl=False) as response:
-                if response.status == 200:
+        while pending:
+            wait = None if hedged else max(hedge_at - time.time(), 0)
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Still nothing by ~p90: race a second judge through the same proxy,
+                # as long as it has a real chance to answer before the deadline
+                hedged = True
+                if deadline - time.time() > HEDGE_MIN_DELAY:
+                    pending.add(launch())
+                continue
+
+            for task in done:
+                exc = task.exception()
+                if exc is None:
+                    if tracker:
+                        tracker.record(task.result())
                     latency = (time.time() - start_time) * 1000
                     return proxy, True, latency
-    except Exception:
-        pass
+                if (_is_ambiguous(exc) and retry_budget > 0
+                        and deadline - time.time() > HEDGE_MIN_DELAY):
+                    retry_budget -= 1
+                    pending.add(launch())
+    finally:
+        for task in pending:
+            task.cancel()
         
     return proxy, False, 0.0
 
-async def check_proxies_generator(proxies, concurrency=300):
+async def check_proxies_generator(proxies, concurrency=300, target_live=None, negative_cache=None, on_skip=None):
     """
     Yields results as they complete.
+    Proxies are started in the order given, so pass them pre-sorted
+    (see core.history.prioritize). `proxies` may also be an async iterable,
+    e.g. core.api.iter_candidates, so checking starts while it is still
+    producing. When `target_live` is set, scheduling
+    stops and in-flight checks are cancelled once that many live proxies
+    have been yielded.
+    With a `negative_cache` (core.negcache.NegativeCache), candidates whose
+    host or /24 has turned out dead are pushed to the end of the run and
+    then only sampled; the rest are skipped, counted in its `skipped` and
+    passed to `on_skip` (e.g. Checkpoint.skip) instead of being yielded.
     """
-    sem = asyncio.Semaphore(concurrency)
-    
-    async def sem_worker(p):
-        async with sem:
-            return await check_single_proxy(p)
+    if hasattr(proxies, "__aiter__"):
+        source = proxies.__aiter__()
+        source_lock = asyncio.Lock()
 
-    tasks = [sem_worker(p) for p in proxies]
-    
-    for future in asyncio.as_completed(tasks):
-        yield await future
+        async def take():
+            # An async iterator can't be advanced by two workers at once
+            async with source_lock:
+                try:
+                    return await source.__anext__()
+                except StopAsyncIteration:
+                    return None
+    else:
+        source = iter(proxies)
+
+        async def take():
+            return next(source, None)
+
+    deferred = deque()
+    tracker = LatencyTracker()
+    results: asyncio.Queue = asyncio.Queue()
+    _done = object()
+
+    async def check(p):
+        result = await check_single_proxy(p, tracker)
+        if negative_cache is not None:
+            negative_cache.record(p, result[1])
+        await results.put(result)
+
+    async def worker():
+        try:
+            # All workers share one iterator, so the global order is preserved
+            while (p := await take()) is not None:
+                if negative_cache is not None and negative_cache.is_dead(p):
+                    deferred.append(p)
+                    continue
+                await check(p)
+
+            # Deferred candidates: only a sample is checked unless their range
+            # has come back to life meanwhile
+            while deferred:
+                p = deferred.popleft()
+                if negative_cache.is_dead(p) and not negative_cache.sample():
+                    negative_cache.skipped += 1
+                    if on_skip:
+                        on_skip(p)
+                    continue
+                await check(p)
+        finally:
+            results.put_nowait(_done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    running = len(workers)
+    live_count = 0
+
+    try:
+        while running:
+            result = await results.get()
+            if result is _done:
+                running -= 1
+                continue
+
+            yield result
+
+            if result[1]:
+                live_count += 1
+                if target_live and live_count >= target_live:
+                    break
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,152 @@
+import os
+import time
+from typing import Dict, List, Set, Tuple
+from .models import Proxy
+
+CHECKPOINT_DIR = os.path.join("output", ".checkpoint")
+CANDIDATES_FILE = "candidates.txt"
+JOURNAL_FILE = "journal.txt"
+
+# Journal writes are buffered by the OS; we only force them to disk every
+# SYNC_EVERY records or SYNC_INTERVAL seconds, whichever comes first.
+SYNC_EVERY = 250
+SYNC_INTERVAL = 2.0
+
+
+class Checkpoint:
+    """
+    Append-only journal of check results so an interrupted scan can resume.
+
+    Layout (inside `directory`):
+      candidates.txt - the full candidate set, one "<url>\t<source>" per line
+      journal.txt    - one line per finished check: "L <latency_ms> <url>" or "D <url>",
+                       or "S <url>" for a candidate skipped in a dead range
+    """
+
+    def __init__(self, directory: str = CHECKPOINT_DIR,
+                 sync_every: int = SYNC_EVERY, sync_interval: float = SYNC_INTERVAL):
+        self.directory = directory
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._journal = None
+        self._unsynced = 0
+        self._last_sync = 0.0
+
+    @property
+    def candidates_path(self) -> str:
+        return os.path.join(self.directory, CANDIDATES_FILE)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.candidates_path)
+
+    def start(self, proxies: List[Proxy]):
+        """Begins a fresh checkpoint for the given candidate set."""
+        self.close()
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write candidates atomically so a crash never leaves a truncated set behind
+        tmp_path = self.candidates_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for p in proxies:
+                f.write(f"{p.to_url()}\t{p.source or ''}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.candidates_path)
+
+        self._open_journal("w")
+
+    def load(self) -> Tuple[List[Proxy], Dict[Proxy, float], Set[Proxy]]:
+        """
+        Reads an existing checkpoint.
+        Returns: (candidates, checked, skipped) where `checked` maps every journaled
+        proxy to its latency in ms (0.0 for dead ones; live ones are always > 0)
+        and `skipped` holds the candidates skipped without a check.
+        """
+        candidates: List[Proxy] = []
+        with open(self.candidates_path, "r", encoding="utf-8") as f:
+            for line in f:
+                url, _, source = line.rstrip("\n").partition("\t")
+                if url.strip():
+                    p = Proxy.from_url(url)
+                    p.source = source or None
+                    candidates.append(p)
+
+        checked: Dict[Proxy, float] = {}
+        skipped: Set[Proxy] = set()
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    # A torn last line (crash mid-write) is simply re-checked
+                    try:
+                        if len(parts) == 3 and parts[0] == "L":
+                            checked[Proxy.from_url(parts[2])] = max(float(parts[1]), 0.001)
+                        elif len(parts) == 2 and parts[0] == "D":
+                            checked[Proxy.from_url(parts[1])] = 0.0
+                        elif len(parts) == 2 and parts[0] == "S":
+                            skipped.add(Proxy.from_url(parts[1]))
+                    except ValueError:
+                        continue
+        return candidates, checked, skipped
+
+    def resume(self):
+        """Re-opens the journal of an existing checkpoint for appending."""
+        self.close()
+        self._open_journal("a")
+
+    def record(self, proxy: Proxy, is_live: bool, latency: float):
+        if self._journal is None:
+            return
+        if is_live:
+            self._journal.write(f"L {latency:.1f} {proxy.to_url()}\n")
+        else:
+            self._journal.write(f"D {proxy.to_url()}\n")
+        self._written()
+
+    def skip(self, proxy: Proxy):
+        """Journals a candidate that was skipped without a check (see core.negcache)."""
+        if self._journal is None:
+            return
+        self._journal.write(f"S {proxy.to_url()}\n")
+        self._written()
+
+    def _written(self):
+        self._unsynced += 1
+        if (self._unsynced >= self.sync_every
+                or time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        if self._journal is None or self._unsynced == 0:
+            return
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._journal is None:
+            return
+        self.sync()
+        self._journal.close()
+        self._journal = None
+
+    def clear(self):
+        """Removes the checkpoint once the scan has been fully exported."""
+        self.close()
+        for path in (self.journal_path, self.candidates_path):
+            if os.path.exists(path):
+                os.remove(path)
+        try:
+            os.rmdir(self.directory)
+        except OSError:
+            pass
+
+    def _open_journal(self, mode: str):
+        self._journal = open(self.journal_path, mode, encoding="utf-8")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
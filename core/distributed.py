@@ -0,0 +1,396 @@
+"""
+Coordinator/worker mode for spreading checks over several machines.
+
+The coordinator owns the candidate list and hands out leases (batches of
+proxies) over a small JSON-over-HTTP protocol:
+
+  POST /lease    {"worker": name, "size": n}
+                 -> {"lease": id, "proxies": [url, ...], "ttl": seconds, "defer": bool}
+                 -> {"lease": null, "done": bool, "retry": seconds}
+  POST /results  {"lease": id, "results": [[url, is_live, latency_ms], ...],
+                  "deferred": [url, ...]}
+                 -> {"ok": true, "done": bool}
+
+Workers check the proxies of all their leases in one continuous pool and
+stream results back in small chunks; every chunk also renews the lease.
+Leases that are not renewed within their TTL are expired and the unchecked
+proxies re-issued.
+
+Workers lease ahead, so by the time a proxy is checked the coordinator's
+dead-range verdict from lease time may be stale. For leases marked "defer",
+the worker also keeps a NegativeCache of its own results and hands proxies
+whose range has died meanwhile back as "deferred" instead of checking them;
+the coordinator then samples or skips them at the end of the scan.
+"""
+import asyncio
+import itertools
+import os
+import socket
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from .models import Proxy
+from .checker import LatencyTracker, check_single_proxy
+from .negcache import NegativeCache
+
+LEASE_SIZE = 200
+LEASE_TTL = 60.0
+RESULT_FLUSH_SIZE = 50
+RESULT_FLUSH_INTERVAL = 1.0
+RETRY_DELAY = 1.0
+# Until the coordinator has answered once (it only starts serving after its
+# scrape), workers keep knocking, backing off up to this delay
+CONNECT_RETRY_MAX = 10.0
+
+
+class _Lease:
+    __slots__ = ("worker", "proxies", "deadline", "defer")
+
+    def __init__(self, worker: str, proxies: List[Proxy], deadline: float, defer: bool = False):
+        self.worker = worker
+        # Ordered, so expired leases are re-issued in their original order
+        self.proxies = dict.fromkeys(proxies)
+        self.deadline = deadline
+        # Whether the worker may hand proxies in dead ranges back
+        self.defer = defer
+
+
+class Coordinator:
+    """
+    Leases candidates to workers and collects their results.
+    Candidates are deduplicated and leased in the order given.
+    With a `negative_cache`, dead ranges are deferred, sampled and skipped
+    as in core.checker.check_proxies_generator, with skipped candidates
+    passed to `on_skip`. Deferral happens both here at lease time and on
+    the workers right before each check (see the module docstring).
+    """
+
+    def __init__(self, proxies: Iterable[Proxy], lease_size: int = LEASE_SIZE,
+                 lease_ttl: float = LEASE_TTL, target_live: Optional[int] = None,
+                 negative_cache=None, on_skip=None):
+        self.candidates = list(dict.fromkeys(proxies))
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.target_live = target_live
+        self.negative_cache = negative_cache
+        self.on_skip = on_skip
+
+        self._by_url: Dict[str, Proxy] = {p.to_url(): p for p in self.candidates}
+        self._pending = deque(self.candidates)
+        self._deferred = deque()
+        self._leases: Dict[str, _Lease] = {}
+        # Expired leases whose proxies may still report late results
+        self._expired: Dict[str, _Lease] = {}
+        self._lease_ids = itertools.count(1)
+        self._checked = set()
+        self._live = 0
+        self._results: asyncio.Queue = asyncio.Queue()
+        self.reissued = 0
+
+    @property
+    def done(self) -> bool:
+        if self.target_live and self._live >= self.target_live:
+            return True
+        return len(self._checked) >= len(self.candidates)
+
+    def lease(self, worker: str, size: Optional[int] = None) -> Optional[Tuple[str, List[Proxy]]]:
+        self.expire()
+        if self.done or not (self._pending or self._deferred):
+            return None
+
+        # Workers ask for at least their concurrency; smaller leases starve them
+        size = size or self.lease_size
+        cache = self.negative_cache
+        # A lease comes either from the main list or from the deferred tail,
+        # never both, so the worker knows whether it may defer again
+        from_tail = not self._pending
+        queue = self._deferred if from_tail else self._pending
+        batch = []
+        while len(batch) < size and queue:
+            p = queue.popleft()
+            # Late results from an expired lease may already cover it
+            if p in self._checked:
+                continue
+            if cache is not None and cache.is_dead(p):
+                if not from_tail:
+                    self._deferred.append(p)
+                    continue
+                if not cache.sample():
+                    self._skip(p)
+                    continue
+            batch.append(p)
+        if not batch:
+            if self.done:
+                self._results.put_nowait(None)
+            return None
+
+        lease_id = f"{worker}-{next(self._lease_ids)}"
+        defer = cache is not None and not from_tail
+        self._leases[lease_id] = _Lease(worker, batch, time.monotonic() + self.lease_ttl, defer)
+        return lease_id, batch
+
+    def submit(self, lease_id: str, results: Iterable[Tuple[str, bool, float]],
+               deferred: Iterable[str] = ()):
+        """
+        Accepts results for a lease, plus the proxies the worker handed back
+        unchecked (`deferred`), which go to the deferred tail. Anything for
+        lease ids that were never issued, or for proxies that were not part
+        of the lease, is ignored.
+        """
+        leases = self._leases if lease_id in self._leases else self._expired
+        lease = leases.get(lease_id)
+        if lease is None:
+            return
+        if leases is self._leases:
+            lease.deadline = time.monotonic() + self.lease_ttl
+
+        for url, is_live, latency in results:
+            proxy = self._by_url.get(url)
+            if proxy is None or proxy not in lease.proxies:
+                continue
+            del lease.proxies[proxy]
+            # Late results from an expired lease may have been re-checked elsewhere
+            if proxy in self._checked:
+                continue
+            self._checked.add(proxy)
+            if self.negative_cache is not None:
+                self.negative_cache.record(proxy, bool(is_live))
+            if is_live:
+                self._live += 1
+            self._results.put_nowait((proxy, bool(is_live), float(latency)))
+
+        for url in deferred:
+            proxy = self._by_url.get(url)
+            if proxy is None or proxy not in lease.proxies:
+                continue
+            del lease.proxies[proxy]
+            if proxy not in self._checked:
+                self._deferred.append(proxy)
+
+        if not lease.proxies:
+            del leases[lease_id]
+        if self.done:
+            self._results.put_nowait(None)
+
+    def _skip(self, proxy: Proxy):
+        self._checked.add(proxy)
+        self.negative_cache.skipped += 1
+        if self.on_skip:
+            self.on_skip(proxy)
+
+    def expire(self):
+        """Re-queues the unchecked part of every lease past its deadline."""
+        now = time.monotonic()
+        for lease_id, lease in list(self._leases.items()):
+            if lease.deadline > now:
+                continue
+            del self._leases[lease_id]
+            self._expired[lease_id] = lease
+            remaining = [p for p in lease.proxies if p not in self._checked]
+            self.reissued += len(remaining)
+            # Back to the front: they were high priority when first leased
+            self._pending.extendleft(reversed(remaining))
+
+    async def run(self, host: str = "0.0.0.0", port: int = 8765) -> AsyncIterator[Tuple[Proxy, bool, float]]:
+        """
+        Serves workers until every candidate is checked (or target_live is hit),
+        yielding (proxy, is_live, latency_ms) as results arrive.
+        """
+        app = web.Application()
+        app.router.add_post("/lease", self._handle_lease)
+        app.router.add_post("/results", self._handle_results)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+
+        try:
+            if self.done:
+                return
+            while True:
+                result = await self._results.get()
+                if result is None:
+                    if self.done:
+                        break
+                    continue
+                yield result
+        finally:
+            # Give polling workers one retry interval to learn that we are done
+            await asyncio.sleep(RETRY_DELAY)
+            await runner.cleanup()
+
+    async def _handle_lease(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        leased = self.lease(str(body.get("worker", "worker")), body.get("size"))
+        if leased is None:
+            return web.json_response({"lease": None, "done": self.done, "retry": RETRY_DELAY})
+        lease_id, batch = leased
+        return web.json_response({
+            "lease": lease_id,
+            "proxies": [p.to_url() for p in batch],
+            "ttl": self.lease_ttl,
+            "defer": self._leases[lease_id].defer,
+        })
+
+    async def _handle_results(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.submit(body.get("lease"), body.get("results", []), body.get("deferred", []))
+        return web.json_response({"ok": True, "done": self.done})
+
+
+async def run_worker(coordinator_url: str, name: Optional[str] = None,
+                     lease_size: int = LEASE_SIZE, concurrency: int = 300,
+                     on_result=None) -> int:
+    """
+    Checks leases from a coordinator until it reports that the scan is done.
+    Returns the number of proxies this worker checked.
+
+    All leases feed one pool of `concurrency` checks: the next lease is
+    fetched as soon as fewer than `concurrency` leased proxies are waiting,
+    so slow proxies at the end of one lease never leave the worker idle.
+
+    Workers may be started before the coordinator is up: connection errors
+    are retried until it answers for the first time. After that, losing
+    the coordinator ends the worker.
+    """
+    base = coordinator_url.rstrip("/")
+    if "://" not in base:
+        base = f"http://{base}"
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    # A lease smaller than the concurrency could never fill the worker
+    size = max(lease_size, concurrency)
+
+    backlog: deque = deque()                 # (lease_id, proxy, defer) not started yet
+    unchecked: Dict[str, int] = {}           # lease_id -> proxies not finished yet
+    unflushed: Dict[str, List[list]] = {}    # lease_id -> results not sent yet
+    handed_back: Dict[str, List[str]] = {}   # lease_id -> deferred urls not sent yet
+    slots = asyncio.Semaphore(concurrency)
+    tracker = LatencyTracker()
+    cache = NegativeCache()                  # this worker's own results only
+    tasks = set()
+    flush_now = asyncio.Event()
+    finished = asyncio.Event()               # coordinator done, or gone
+    served = False                           # coordinator has answered once
+    checked = 0
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+
+        async def post(path: str, payload: dict) -> dict:
+            async with session.post(f"{base}{path}", json=payload) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        async def check(lease_id: str, proxy: Proxy):
+            nonlocal checked
+            try:
+                proxy, is_live, latency = await check_single_proxy(proxy, tracker)
+            finally:
+                slots.release()
+            checked += 1
+            cache.record(proxy, is_live)
+            unchecked[lease_id] -= 1
+            unflushed[lease_id].append([proxy.to_url(), is_live, latency])
+            if len(unflushed[lease_id]) >= RESULT_FLUSH_SIZE:
+                flush_now.set()
+            if on_result:
+                on_result(proxy, is_live, latency)
+
+        async def lease_more() -> Optional[float]:
+            """Leases another batch; returns how long to wait if none was available."""
+            nonlocal served
+            reply = await post("/lease", {"worker": name, "size": size})
+            served = True
+            lease_id = reply.get("lease")
+            if lease_id is None:
+                if reply.get("done"):
+                    finished.set()
+                return reply.get("retry", RETRY_DELAY)
+            proxies = [Proxy.from_url(url) for url in reply["proxies"]]
+            unchecked[lease_id] = len(proxies)
+            unflushed[lease_id] = []
+            handed_back[lease_id] = []
+            defer = bool(reply.get("defer"))
+            backlog.extend((lease_id, p, defer) for p in proxies)
+            return None
+
+        async def dispatch():
+            retry_at = 0.0
+            backoff = RETRY_DELAY
+            while True:
+                # Lease ahead, so the next batch is in hand before the slots run dry
+                if len(backlog) < concurrency and time.monotonic() >= retry_at:
+                    try:
+                        delay = await lease_more()
+                    except (aiohttp.ClientError, asyncio.TimeoutError):
+                        if served:
+                            raise
+                        # Coordinator not listening yet, most likely still scraping
+                        delay, backoff = backoff, min(backoff * 2, CONNECT_RETRY_MAX)
+                    if delay is not None:
+                        retry_at = time.monotonic() + delay
+                    continue
+                if not backlog:
+                    await asyncio.sleep(max(retry_at - time.monotonic(), 0.0))
+                    continue
+                await slots.acquire()
+                lease_id, proxy, defer = backlog.popleft()
+                if defer and cache.is_dead(proxy):
+                    # Its range died while the proxy sat in the backlog
+                    slots.release()
+                    unchecked[lease_id] -= 1
+                    handed_back[lease_id].append(proxy.to_url())
+                    continue
+                task = asyncio.create_task(check(lease_id, proxy))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        async def flush():
+            # Every active lease is posted, even without new results, which renews it
+            for lease_id in list(unflushed):
+                results, unflushed[lease_id] = unflushed[lease_id], []
+                deferred, handed_back[lease_id] = handed_back[lease_id], []
+                if not unchecked[lease_id]:
+                    del unflushed[lease_id], unchecked[lease_id], handed_back[lease_id]
+                reply = await post("/results", {
+                    "lease": lease_id, "results": results, "deferred": deferred,
+                })
+                if reply.get("done"):
+                    # Target reached (possibly elsewhere): drop whatever is left
+                    finished.set()
+                    return
+
+        async def flusher():
+            loop = asyncio.get_running_loop()
+            while True:
+                # Wakes up every interval, or earlier once a chunk is full.
+                # Not wait_for(): on 3.11 it can swallow the final cancel()
+                wake = loop.call_later(RESULT_FLUSH_INTERVAL, flush_now.set)
+                try:
+                    await flush_now.wait()
+                finally:
+                    wake.cancel()
+                flush_now.clear()
+                await flush()
+
+        async def until_finished(coro):
+            try:
+                await coro
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Coordinator gone: it either finished or crashed, nothing left to do
+                finished.set()
+
+        background = [
+            asyncio.create_task(until_finished(dispatch())),
+            asyncio.create_task(until_finished(flusher())),
+        ]
+        try:
+            await finished.wait()
+        finally:
+            for task in [*background, *tasks]:
+                task.cancel()
+            await asyncio.gather(*background, *tasks, return_exceptions=True)
+
+    return checked
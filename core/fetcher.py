@@ -1,17 +1,31 @@
 import re
 import aiohttp
 import asyncio
+import codecs
 import json
 import time
-from typing import List, Set, Union
+from collections import Counter
+from typing import List, Optional, Set, Union
 from rich.console import Console
 from rich.panel import Panel
 from rich.live import Live
 from .models import Proxy, Protocol
+from .html_table import iter_table_rows
+from .validation import CandidateValidator
+from .history import ProxyHistory, plan_providers
 
 console = Console()
 
-PROXY_REGEX = re.compile(r'(?:^|\s)((?:[0-9]{1,3}\.){3}[0-9]{1,3})(?::|\s+)([0-9]{1,5})(?:\s|$)')
+# The trailing boundary is a lookahead so the newline stays available as the
+# leading boundary of the next line (otherwise findall skips every other line).
+PROXY_REGEX = re.compile(r'(?:^|\s)((?:[0-9]{1,3}\.){3}[0-9]{1,3})(?::|\s+)([0-9]{1,5})(?=\s|$)')
+
+# ProxyDB cell contents; cells come from iter_table_rows without their <td> tags
+PROXYDB_IP_REGEX = re.compile(r'[>"]\s*(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s*[<"]')
+PROXYDB_PORT_LINK_REGEX = re.compile(r'<a[^>]*>(\d+)</a>')
+PROXYDB_PORT_REGEX = re.compile(r'>\s*(\d+)\s*<')
+
+STATS_FILE = "fetch_stats.txt"
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
@@ -24,12 +38,33 @@ PROXYDB_STEPS = len(range(0, PROXYDB_MAX_OFFSET + 1, PROXYDB_STEP))
 
 FREEPROXYDB_PAGES = 25
 
+# Provider bodies are parsed as they stream in; at most MAX_INFLIGHT_BYTES of
+# downloaded-but-unparsed text is held across all concurrent fetches (see
+# ByteBudget; only the oldest download may go over, to finish a JSON body).
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_INFLIGHT_BYTES = 4 * 1024 * 1024
+
+# Providers fetched at the same time. Fewer than there are providers, so
+# the schedule order (best live yield first) decides who goes first.
+PROVIDER_CONCURRENCY = 8
+# Paginated scrapers spend most of their time sleeping between pages; they
+# start right away instead of waiting for (and then holding) a slot
+PAGINATED_PROVIDERS = ("ProxyDB", "FreeProxyDB", "LumiProxy")
+
 LUMIPROXY_PAGES = 29
 LUMIPROXY_BASE = (
     "https://api.lumiproxy.com/web_v1/free-proxy/list"
     "?page_size=60&page={page}&language=en-us"
 )
 
+def append_stats(stats_file: Optional[str], *lines: str):
+    """Appends lines to the fetch stats file; `stats_file=None` turns stats off."""
+    if stats_file is None:
+        return
+    with open(stats_file, "a", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+
 async def fetch_url(session: aiohttp.ClientSession, url: str) -> str:
     try:
         async with session.get(url, headers=HEADERS, timeout=30) as response:
@@ -94,13 +129,143 @@ def parse_proxies_from_text(content: str, default_protocol: Protocol) -> List[Pr
     except json.JSONDecodeError:
         pass 
     
-    matches = PROXY_REGEX.findall(content)
-    for ip, port in matches:
-        proxies.append(Proxy(ip=ip, port=int(port), protocol=default_protocol))
+    return parse_proxies_from_lines(content, default_protocol)
+
+def parse_proxies_from_lines(content: str, default_protocol: Protocol) -> List[Proxy]:
+    """Plain "ip:port" / "ip port" lists; `content` must end on a line boundary."""
+    return [
+        Proxy(ip=ip, port=int(port), protocol=default_protocol)
+        for ip, port in PROXY_REGEX.findall(content)
+    ]
+
+class ByteBudget:
+    """
+    Caps the downloaded-but-unparsed text held across concurrent downloads.
+    acquire() waits until the bytes fit under `limit`, which also stops that
+    download from reading its socket. The oldest holder may always go over
+    the limit, so streams that must buffer a whole body (JSON) can't
+    deadlock each other waiting for room.
+    """
+
+    def __init__(self, limit: int = MAX_INFLIGHT_BYTES):
+        self.limit = limit
+        self.used = 0
+        # holder -> bytes held; insertion order is age order
+        self._holders = {}
+        self._changed = asyncio.Condition()
+
+    def _fits(self, holder, n: int) -> bool:
+        return self.used + n <= self.limit or next(iter(self._holders), holder) is holder
+
+    async def acquire(self, holder, n: int):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._fits(holder, n))
+            self.used += n
+            self._holders[holder] = self._holders.get(holder, 0) + n
+
+    async def release(self, holder, n: int, done: bool = False):
+        """Returns `n` bytes; with `done`, the holder gives up its place in line."""
+        async with self._changed:
+            self.used -= n
+            self._holders[holder] = self._holders.get(holder, 0) - n
+            if done:
+                del self._holders[holder]
+            self._changed.notify_all()
+
+
+async def stream_proxies(
+    session: aiohttp.ClientSession,
+    url: str,
+    protocol: Protocol,
+    budget: ByteBudget,
+    on_batch,
+) -> bool:
+    """
+    Downloads `url` chunk by chunk and hands the proxies found in every chunk
+    to `on_batch` as soon as it arrives. Every chunk is reserved in `budget`
+    before it is decoded, and stays reserved for as long as its text is held:
+    only the unparsed tail of a line list, but all of a JSON body, since JSON
+    APIs can't be parsed incrementally and are parsed once complete.
+    Returns False if the provider could not be fetched.
+    """
+    holder = object()
+    held = 0
+    try:
+        async with session.get(url, headers=HEADERS, timeout=30) as response:
+            if response.status != 200:
+                return False
+
+            decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+            tail = ""
+            json_parts = None
+            decided = False
+
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                await budget.acquire(holder, len(chunk))
+                held += len(chunk)
+                text = tail + decoder.decode(chunk)
+                if not decided and text.strip():
+                    # Decided once, on the first content: in a plain list, a
+                    # later chunk starting with "[" is just another line
+                    decided = True
+                    if text.lstrip()[0] in "{[":
+                        json_parts = []
+                if json_parts is not None:
+                    json_parts.append(text)
+                    tail = ""
+                    continue
+
+                # Only parse complete lines; the remainder waits for the next chunk
+                cut = text.rfind("\n")
+                if cut == -1:
+                    tail = text
+                    continue
+                batch = parse_proxies_from_lines(text[:cut + 1], protocol)
+                tail = text[cut + 1:]
+                await budget.release(holder, held - len(tail))
+                held = len(tail)
+                if batch:
+                    await on_batch(batch)
+
+            tail += decoder.decode(b"", final=True)
+            if json_parts is not None:
+                batch = parse_proxies_from_text("".join(json_parts) + tail, protocol)
+            else:
+                batch = parse_proxies_from_lines(tail + "\n", protocol)
+            if batch:
+                await on_batch(batch)
+            return True
+    except Exception:
+        return False
+    finally:
+        await budget.release(holder, held, done=True)
+
+
+def parse_proxydb_page(content: str) -> List[Proxy]:
+    """Extracts proxies from one proxydb.net result page."""
+    proxies = []
     
+    for cells in iter_table_rows(content):
+        if len(cells) < 3: continue
+        
+        # Wrapped in ><, so a bare "1.2.3.4" cell matches like a tagged one
+        ip_m = PROXYDB_IP_REGEX.search(f">{cells[0]}<")
+        if not ip_m: continue
+        ip = ip_m.group(1)
+        
+        port_m = PROXYDB_PORT_LINK_REGEX.search(cells[1])
+        if not port_m: port_m = PROXYDB_PORT_REGEX.search(f">{cells[1]}<")
+        if not port_m: continue
+        port = int(port_m.group(1))
+        
+        p_cell = cells[2].lower()
+        protocol = Protocol.HTTP
+        if "socks5" in p_cell: protocol = Protocol.SOCKS5
+        elif "socks4" in p_cell: protocol = Protocol.SOCKS4
+        
+        proxies.append(Proxy(ip=ip, port=port, protocol=protocol))
     return proxies
 
-
 async def fetch_proxydb(
     session: aiohttp.ClientSession,
     on_progress=None,
@@ -133,29 +298,8 @@ async def fetch_proxydb(
                 async with session.get(url, headers=headers, timeout=20) as response:
                     if response.status == 200:
                         content = await response.text()
-                        rows = re.findall(r'<tr>(.*?)</tr>', content, re.DOTALL)
-                        
-                        for row in rows:
-                            cells = row.split('</td>')
-                            if len(cells) < 3: continue
-                            
-                            ip_m = re.search(r'(?:>|")(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})(?:<|")', cells[0])
-                            if not ip_m: continue
-                            ip = ip_m.group(1)
-                            
-                            port_m = re.search(r'<a[^>]*>(\d+)</a>', cells[1])
-                            if not port_m: port_m = re.search(r'>(\d+)<', cells[1])
-                            if not port_m: continue
-                            port = int(port_m.group(1))
-                            
-                            p_cell = cells[2]
-                            protocol = Protocol.HTTP
-                            if "socks5" in p_cell.lower(): protocol = Protocol.SOCKS5
-                            elif "socks4" in p_cell.lower(): protocol = Protocol.SOCKS4
-                            
-                            p = Proxy(ip=ip, port=port, protocol=protocol)
-                            proxydb_proxies.append(p)
-                            batch_proxies.append(p)
+                        batch_proxies = parse_proxydb_page(content)
+                        proxydb_proxies.extend(batch_proxies)
                         
                         success = True
                         break
@@ -198,37 +342,41 @@ FREEPROXYDB_BASE = (
     "&page_index={page_index}&page_size=100&subscribe_format=original"
 )
 
+def parse_freeproxydb_lines(content: str) -> List[Proxy]:
+    """Parses FreeProxyDB's "socks://ip:port" subscription format."""
+    proxies = []
+    for line in content.splitlines():
+        line = line.strip()
+        if not line.lower().startswith("socks://"):
+            continue
+        rest = line[7:]  # "socks://"
+        if ":" not in rest:
+            continue
+        try:
+            ip, port_str = rest.rsplit(":", 1)
+            port = int(port_str)
+            if 1 <= port <= 65535:
+                proxies.append(Proxy(ip=ip.strip(), port=port, protocol=Protocol.SOCKS5))
+        except (ValueError, TypeError):
+            continue
+    return proxies
+
 async def fetch_freeproxydb(
     session: aiohttp.ClientSession,
     on_progress=None,
     progress_offset: int = 0,
     total_steps: int = 0,
+    stats_file: Optional[str] = STATS_FILE,
 ) -> List[Proxy]:
     all_proxies: List[Proxy] = []
     for page_index in range(1, FREEPROXYDB_PAGES + 1):
         url = FREEPROXYDB_BASE.format(page_index=page_index)
         try:
             content = await fetch_url(session, url)
-            batch = []
-            for line in content.splitlines():
-                line = line.strip()
-                if not line.lower().startswith("socks://"):
-                    continue
-                rest = line[7:]  # "socks://"
-                if ":" not in rest:
-                    continue
-                try:
-                    ip, port_str = rest.rsplit(":", 1)
-                    port = int(port_str)
-                    if 1 <= port <= 65535:
-                        p = Proxy(ip=ip.strip(), port=port, protocol=Protocol.SOCKS5)
-                        all_proxies.append(p)
-                        batch.append(p)
-                except (ValueError, TypeError):
-                    continue
+            batch = parse_freeproxydb_lines(content)
+            all_proxies.extend(batch)
             if content:
-                with open("fetch_stats.txt", "a", encoding="utf-8") as f:
-                    f.write(f"FreeProxyDB page {page_index}: {len(batch)} proxies\n")
+                append_stats(stats_file, f"FreeProxyDB page {page_index}: {len(batch)} proxies")
             if on_progress and total_steps > 0:
                 try:
                     global_step = progress_offset + page_index
@@ -248,11 +396,46 @@ async def fetch_freeproxydb(
             await asyncio.sleep(1.5)
     return all_proxies
 
+def parse_lumiproxy_json(content: str) -> List[Proxy]:
+    """Parses one page of the LumiProxy free-proxy API."""
+    proxies: List[Proxy] = []
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        return proxies
+
+    items = (
+        data.get("data", {}).get("list", [])
+        if isinstance(data, dict)
+        else []
+    )
+    for item in items:
+        ip = item.get("ip")
+        port = item.get("port")
+        proto_num = item.get("protocol")
+        if not ip or not port:
+            continue
+
+        # LumiProxy protocol mapping guess:
+        # 4 -> SOCKS4, 8 -> SOCKS5, others -> HTTP
+        protocol = Protocol.HTTP
+        if proto_num == 4:
+            protocol = Protocol.SOCKS4
+        elif proto_num == 8:
+            protocol = Protocol.SOCKS5
+
+        try:
+            proxies.append(Proxy(ip=str(ip), port=int(port), protocol=protocol))
+        except (TypeError, ValueError):
+            continue
+    return proxies
+
 async def fetch_lumiproxy(
     session: aiohttp.ClientSession,
     on_progress=None,
     progress_offset: int = 0,
     total_steps: int = 0,
+    stats_file: Optional[str] = STATS_FILE,
 ) -> List[Proxy]:
     """
     Fetches proxies from LumiProxy free-proxy API.
@@ -266,42 +449,10 @@ async def fetch_lumiproxy(
         try:
             content = await fetch_url(session, url)
             if content:
-                try:
-                    data = json.loads(content)
-                    items = (
-                        data.get("data", {}).get("list", [])
-                        if isinstance(data, dict)
-                        else []
-                    )
-                    for item in items:
-                        ip = item.get("ip")
-                        port = item.get("port")
-                        proto_num = item.get("protocol")
-                        if not ip or not port:
-                            continue
-
-                        # LumiProxy protocol mapping guess:
-                        # 4 -> SOCKS4, 8 -> SOCKS5, others -> HTTP
-                        protocol = Protocol.HTTP
-                        try:
-                            if proto_num == 4:
-                                protocol = Protocol.SOCKS4
-                            elif proto_num == 8:
-                                protocol = Protocol.SOCKS5
-                        except Exception:
-                            protocol = Protocol.HTTP
-
-                        try:
-                            p = Proxy(ip=str(ip), port=int(port), protocol=protocol)
-                            all_proxies.append(p)
-                            batch.append(p)
-                        except (TypeError, ValueError):
-                            continue
-                except json.JSONDecodeError:
-                    pass
+                batch = parse_lumiproxy_json(content)
+                all_proxies.extend(batch)
 
-            with open("fetch_stats.txt", "a", encoding="utf-8") as f:
-                f.write(f"LumiProxy page {page}: {len(batch)} proxies\n")
+            append_stats(stats_file, f"LumiProxy page {page}: {len(batch)} proxies")
 
             if on_progress and total_steps > 0:
                 try:
@@ -324,6 +475,30 @@ async def fetch_lumiproxy(
 
     return all_proxies
 
+def parse_free_proxy_list_page(content: str, p_type: str) -> List[Proxy]:
+    """Extracts proxies from a free-proxy-list.net table ("socks" or "http" page)."""
+    proxies = []
+    
+    for cols in iter_table_rows(content, tbody_only=True):
+        if not cols: continue
+        
+        if p_type == "socks" and len(cols) >= 5:
+            ip = cols[0]
+            port = cols[1]
+            version = cols[4].lower()
+            
+            protocol = Protocol.SOCKS4
+            if "socks5" in version: protocol = Protocol.SOCKS5
+            elif "socks4" in version: protocol = Protocol.SOCKS4
+            
+            proxies.append(Proxy(ip=ip, port=int(port), protocol=protocol))
+            
+        elif p_type == "http" and len(cols) >= 7:
+            ip = cols[0]
+            port = cols[1]
+            proxies.append(Proxy(ip=ip, port=int(port), protocol=Protocol.HTTP))
+    return proxies
+
 async def fetch_free_proxy_list(session: aiohttp.ClientSession, on_progress=None) -> List[Proxy]:
     """Scrapes free-proxy-list.net for proxies."""
     targets = [
@@ -342,39 +517,8 @@ async def fetch_free_proxy_list(session: aiohttp.ClientSession, on_progress=None
                 if response.status == 200:
                     content = await response.text()
                     
-                    # Extract table body
-                    tbody_match = re.search(r'<tbody>(.*?)</tbody>', content, re.DOTALL)
-                    if not tbody_match: continue
-                    tbody = tbody_match.group(1)
-                    
-                    rows = re.findall(r'<tr>(.*?)</tr>', tbody, re.DOTALL)
-                    
-                    batch_proxies = []
-                    for row in rows:
-                        cols = re.findall(r'<td.*?>(.*?)</td>', row)
-                        if not cols: continue
-                        
-                        if p_type == "socks" and len(cols) >= 5:
-                            ip = cols[0]
-                            port = cols[1]
-                            version = cols[4].lower()
-                            
-                            protocol = Protocol.SOCKS4
-                            if "socks5" in version: protocol = Protocol.SOCKS5
-                            elif "socks4" in version: protocol = Protocol.SOCKS4
-                            
-                            p = Proxy(ip=ip, port=int(port), protocol=protocol)
-                            found_proxies.append(p)
-                            batch_proxies.append(p)
-                            
-                        elif p_type == "http" and len(cols) >= 7:
-                            ip = cols[0]
-                            port = cols[1]
-                            protocol = Protocol.HTTP
-                            
-                            p = Proxy(ip=ip, port=int(port), protocol=protocol)
-                            found_proxies.append(p)
-                            batch_proxies.append(p)
+                    batch_proxies = parse_free_proxy_list_page(content, p_type)
+                    found_proxies.extend(batch_proxies)
 
                     if on_progress:
                         await on_progress(
@@ -392,9 +536,73 @@ async def fetch_free_proxy_list(session: aiohttp.ClientSession, on_progress=None
     return found_proxies
 
 
-async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> List[Proxy]:
-    with open("fetch_stats.txt", "w", encoding="utf-8") as f:
-        f.write(f"--- Proxy Fetch Stats ({time.strftime('%Y-%m-%d %H:%M:%S')}) ---\n")
+def write_reject_stats(validator: CandidateValidator, stats_file: Optional[str] = STATS_FILE):
+    """Appends per-provider reject counts to fetch_stats.txt."""
+    if not validator.rejects:
+        return
+    lines = [f"--- Rejected candidates: {validator.total_rejected} ---"]
+    for provider, reasons in sorted(validator.rejects.items()):
+        detail = ", ".join(f"{reason}: {count}" for reason, count in sorted(reasons.items()))
+        lines.append(f"{provider}: {detail}")
+    append_stats(stats_file, *lines)
+
+
+def write_provider_stats(history: ProxyHistory, fetched, skipped, stats_file: Optional[str] = STATS_FILE):
+    """Appends this run's per-provider yield to fetch_stats.txt."""
+    lines = ["--- Provider yield (unique share / live proxies per minute, all runs) ---"]
+    for name in fetched:
+        unique = history.unique_rate(name)
+        live = history.live_yield(name)
+        unique_str = f"{unique:.0%}" if unique is not None else "n/a"
+        live_str = f"{live:.1f}" if live is not None else "n/a"
+        lines.append(f"{name}: {unique_str} unique, {live_str} live/min")
+    lines.extend(f"{name}: skipped (low yield)" for name in skipped)
+    append_stats(stats_file, *lines)
+
+
+def dedupe_new(batch: List[Proxy], seen: Set[Proxy], provider: str | None = None) -> List[Proxy]:
+    """Adds unseen proxies from `batch` to `seen` and returns only those."""
+    new_proxies = []
+    for p in batch:
+        if p not in seen:
+            if p.source is None:
+                p.source = provider
+            seen.add(p)
+            new_proxies.append(p)
+    return new_proxies
+
+
+async def fetch_all_proxies(
+    providers_file: str,
+    advanced_url: str = None,
+    show_progress: bool = True,
+    on_new_proxies=None,
+    validator: CandidateValidator | None = None,
+    history: Optional[ProxyHistory] = None,
+    min_yield: Optional[float] = None,
+    stats_file: Optional[str] = STATS_FILE,
+) -> List[Proxy]:
+    """
+    Scrapes every provider and returns the unique proxies found.
+    `on_new_proxies`, if given, is called with each batch of newly seen
+    proxies as soon as it arrives. Set `show_progress=False` to run
+    without the rich progress panel (e.g. when embedding ProxyGod).
+    Candidates rejected by `validator` (bogons, bad ports, blocklists)
+    are dropped before dedupe and counted per provider.
+    With a `history`, each provider's fetch time and unique yield are
+    recorded there and list providers are started best-yield first,
+    PROVIDER_CONCURRENCY at a time (paginated scrapers start right away);
+    providers under `min_yield` live proxies per minute are skipped (see
+    core.history.plan_providers). Without a history, everything starts at
+    once.
+    Per-provider stats go to `stats_file`; pass None to write nothing.
+    """
+    if validator is None:
+        validator = CandidateValidator()
+
+    if stats_file is not None:
+        with open(stats_file, "w", encoding="utf-8") as f:
+            f.write(f"--- Proxy Fetch Stats ({time.strftime('%Y-%m-%d %H:%M:%S')}) ---\n")
 
     all_proxies: Set[Proxy] = set()
     
@@ -462,13 +670,9 @@ async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> Li
         page_max: int | None = None,
     ):
         nonlocal total_fetched
-        added_count = 0
-        for p in new_proxies:
-            if p not in all_proxies:
-                all_proxies.add(p)
-                added_count += 1
-        
         total_fetched = len(all_proxies)
+        if on_new_proxies and new_proxies:
+            on_new_proxies(new_proxies)
         
         # Update per-provider page info
         if provider and provider in provider_pages:
@@ -502,6 +706,8 @@ async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> Li
         # Update UI if Live is active
         if current_live_update:
             content = f"[bold green]Total Unique Proxies: {total_fetched}[/bold green]"
+            if validator.total_rejected:
+                content += f"\n[red]Rejected (invalid/bogon/blocked): {validator.total_rejected}[/red]"
             if total_steps > 0:
                 content += f"\n[yellow]Overall progress: {pct}%[/yellow]"
                 content += f"\n[cyan]Estimated Time Remaining: {eta_str}[/cyan]"
@@ -510,7 +716,9 @@ async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> Li
                 for name, info in provider_pages.items():
                     p_page = info.get("page", 0)
                     p_total = info.get("total", 0)
-                    if p_total > 0 and p_page > 0:
+                    if info.get("skipped"):
+                        content += f"\n[dim]{name}: skipped (low yield)[/dim]"
+                    elif p_total > 0 and p_page > 0:
                         content += f"\n[white]{name}[/white]: page {p_page}/{p_total}"
                     elif p_total > 0:
                         content += f"\n[white]{name}[/white]: waiting (0/{p_total})"
@@ -522,34 +730,60 @@ async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> Li
             
             current_live_update(Panel(content, title="Scraping Proxies", border_style="cyan"))
 
+    # Per provider (= proxy source): valid proxies returned, and how many of those were new
+    fetched_counts: Counter = Counter()
+    unique_counts: Counter = Counter()
+    durations = {}
+
+    async def collect(batch, provider: str | None = None, **progress):
+        """Validates and dedupes a provider batch; only new, valid proxies reach master_callback."""
+        batch = validator.filter(batch, provider)
+        fetched_counts.update(p.source or provider for p in batch)
+        new_proxies = dedupe_new(batch, all_proxies, provider)
+        unique_counts.update(p.source for p in new_proxies)
+        await master_callback(new_proxies, provider=provider, **progress)
+
+    async def timed(name, coro):
+        started = time.monotonic()
+        await coro
+        durations[name] = time.monotonic() - started
+
+    budget = ByteBudget(MAX_INFLIGHT_BYTES)
+
     async with aiohttp.ClientSession() as session:
         
         # Wrapped standard fetcher
         async def fetch_standard(url, protocol):
-             content = await fetch_url(session, url)
-             found = parse_proxies_from_text(content, protocol)
+             found = 0
+
+             async def on_batch(batch):
+                 nonlocal found
+                 found += len(batch)
+                 for p in batch:
+                     p.source = url
+                 # Update global (no effect on %)
+                 await collect(
+                     batch,
+                     current_step=0,
+                     total_steps=0,
+                     provider="Standard",
+                     page=None,
+                     page_max=None,
+                 )
+
+             ok = await stream_proxies(session, url, protocol, budget, on_batch)
              
              # Log stats
-             msg = f"Fetched {len(found)} from {url}" if found else f"Failed {url}"
-             with open("fetch_stats.txt", "a", encoding="utf-8") as f:
-                 f.write(msg + "\n")
-                 
-             # Update global (no effect on %)
-             await master_callback(
-                 found,
-                 current_step=0,
-                 total_steps=0,
-                 provider="Standard",
-                 page=None,
-                 page_max=None,
-             )
+             msg = f"Fetched {found} from {url}" if ok and found else f"Failed {url}"
+             append_stats(stats_file, msg)
              return found
 
-        # Prepare Tasks
-        tasks = []
+        # Prepare Tasks, keyed by provider name (the proxies' source).
+        # Coroutines are created only for providers that are actually fetched.
+        providers = {}
         for protocol, urls in urls_by_protocol.items():
             for url in urls:
-                tasks.append(fetch_standard(url, protocol))
+                providers[url] = lambda url=url, protocol=protocol: fetch_standard(url, protocol)
         
         # Progress offsets for long-running providers
         proxydb_offset = 0
@@ -557,44 +791,83 @@ async def fetch_all_proxies(providers_file: str, advanced_url: str = None) -> Li
         lumiproxy_offset = PROXYDB_STEPS + FREEPROXYDB_PAGES
         
         # Add ProxyDB task with unified progress
-        tasks.append(
-            fetch_proxydb(
-                session,
-                master_callback,
-                progress_offset=proxydb_offset,
-                total_steps=global_total_steps,
-            )
+        providers["ProxyDB"] = lambda: fetch_proxydb(
+            session,
+            collect,
+            progress_offset=proxydb_offset,
+            total_steps=global_total_steps,
         )
         # Add FreeProxyList task (instant, no %)
-        tasks.append(fetch_free_proxy_list(session, master_callback))
+        providers["FreeProxyList"] = lambda: fetch_free_proxy_list(session, collect)
         # FreeProxyDB API: page_index 1-25, 100 per page, socks://ip:port
-        tasks.append(
-            fetch_freeproxydb(
-                session,
-                master_callback,
-                progress_offset=freeproxydb_offset,
-                total_steps=global_total_steps,
-            )
+        providers["FreeProxyDB"] = lambda: fetch_freeproxydb(
+            session,
+            collect,
+            progress_offset=freeproxydb_offset,
+            total_steps=global_total_steps,
+            stats_file=stats_file,
         )
         # LumiProxy API: page 1-29, 60 per page, 5s delay
-        tasks.append(
-            fetch_lumiproxy(
-                session,
-                master_callback,
-                progress_offset=lumiproxy_offset,
-                total_steps=global_total_steps,
-            )
+        providers["LumiProxy"] = lambda: fetch_lumiproxy(
+            session,
+            collect,
+            progress_offset=lumiproxy_offset,
+            total_steps=global_total_steps,
+            stats_file=stats_file,
         )
 
+        # Best-yield providers are fetched first, PROVIDER_CONCURRENCY at a
+        # time; low-yield ones may be skipped altogether. Without a history
+        # there is no ranking, so a bound would only slow things down.
+        scheduled, skipped = plan_providers(providers, history, min_yield)
+        for name in skipped:
+            if name in provider_pages:
+                provider_pages[name]["skipped"] = True
+        global_total_steps = sum(
+            info["total"] for name, info in provider_pages.items() if name in scheduled
+        )
+        paginated = [name for name in scheduled if name in PAGINATED_PROVIDERS]
+        listed = [name for name in scheduled if name not in PAGINATED_PROVIDERS]
+        slots = PROVIDER_CONCURRENCY if history is not None else len(listed)
+        queue = iter(listed)
+
+        async def provider_worker():
+            # All workers share one iterator, so providers start in schedule order
+            for name in queue:
+                await timed(name, providers[name]())
+
+        async def run_scheduled():
+            await asyncio.gather(
+                *(timed(name, providers[name]()) for name in paginated),
+                *(provider_worker() for _ in range(min(slots, len(listed)))),
+            )
+
+        def record_yield():
+            if history is None:
+                return
+            for name in skipped:
+                history.record_skip(name)
+            for name, seconds in durations.items():
+                history.record_fetch(name, fetched_counts[name], unique_counts[name], seconds)
+            write_provider_stats(history, durations, skipped, stats_file)
+
+        if not show_progress:
+            await run_scheduled()
+            write_reject_stats(validator, stats_file)
+            record_yield()
+            return list(all_proxies)
+
         # Launch UI and Tasks
         with Live(console=console, transient=True, refresh_per_second=4) as live:
              current_live_update = live.update
              
              live.update(Panel("[cyan]Initializing Scrape...[/cyan]", title="Scraping", border_style="cyan"))
              
-             # Run all tasks parallel
-             await asyncio.gather(*tasks)
+             await run_scheduled()
              
+             write_reject_stats(validator, stats_file)
+             record_yield()
+
              # Final
              live.update(Panel(f"[bold green]Scraping Complete![/bold green]\nTotal Unique: {len(all_proxies)}", border_style="green"))
              await asyncio.sleep(1.5)
@@ -0,0 +1,175 @@
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .models import Proxy, Protocol
+
+HISTORY_FILE = os.path.join("output", "history.json")
+
+# Entries for proxies not seen for this long are dropped on save
+HISTORY_MAX_AGE = 14 * 24 * 3600
+
+# How many checks of "evidence" the source reliability is worth when a proxy
+# has little or no history of its own (Bayesian smoothing prior).
+SOURCE_PRIOR_WEIGHT = 2.0
+# Live rate assumed for sources we have never seen before
+DEFAULT_LIVE_RATE = 0.05
+
+# A provider skipped for low yield is fetched again after this many skipped
+# runs, so one that improves gets a chance to prove it
+PROVIDER_REPROBE_EVERY = 5
+
+
+class ProxyHistory:
+    """
+    Per-proxy and per-source liveness statistics, persisted across runs.
+
+    Stored as JSON:
+      {"proxies": {url: [checks, live, last_seen]}, "sources": {name: [checks, live]},
+       "providers": {name: [runs, fetched, unique, seconds, skipped_runs]}}
+
+    A provider is a scraped source as seen by the fetcher (a list URL, or
+    "ProxyDB", "LumiProxy", ...); it is the same key as the proxies' source.
+    """
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self.proxies: Dict[str, List[float]] = {}
+        self.sources: Dict[str, List[float]] = {}
+        self.providers: Dict[str, List[float]] = {}
+
+    def load(self) -> "ProxyHistory":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.proxies = data.get("proxies", {})
+            self.sources = data.get("sources", {})
+            self.providers = data.get("providers", {})
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            self.proxies, self.sources, self.providers = {}, {}, {}
+        return self
+
+    def save(self):
+        cutoff = time.time() - HISTORY_MAX_AGE
+        self.proxies = {url: s for url, s in self.proxies.items() if s[2] >= cutoff}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"proxies": self.proxies, "sources": self.sources, "providers": self.providers}, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, proxy: Proxy, is_live: bool):
+        stats = self.proxies.setdefault(proxy.to_url(), [0, 0, 0])
+        stats[0] += 1
+        stats[1] += int(is_live)
+        stats[2] = int(time.time())
+
+        if proxy.source:
+            s_stats = self.sources.setdefault(proxy.source, [0, 0])
+            s_stats[0] += 1
+            s_stats[1] += int(is_live)
+
+    def source_rate(self, source: Optional[str]) -> float:
+        stats = self.sources.get(source) if source else None
+        if not stats:
+            return DEFAULT_LIVE_RATE
+        checks, live = stats
+        # Smooth toward the default so one lucky check doesn't top the ranking
+        return (live + DEFAULT_LIVE_RATE * SOURCE_PRIOR_WEIGHT) / (checks + SOURCE_PRIOR_WEIGHT)
+
+    def record_fetch(self, provider: str, fetched: int, unique: int, seconds: float):
+        """Records one fetch: valid proxies returned, how many were new, and how long it took."""
+        stats = self.providers.setdefault(provider, [0, 0, 0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += fetched
+        stats[2] += unique
+        stats[3] += seconds
+        stats[4] = 0
+
+    def record_skip(self, provider: str):
+        stats = self.providers.get(provider)
+        if stats:
+            stats[4] += 1
+
+    def unique_rate(self, provider: str) -> Optional[float]:
+        """Share of a provider's proxies no other provider had found first."""
+        stats = self.providers.get(provider)
+        if not stats or not stats[1]:
+            return None
+        return stats[2] / stats[1]
+
+    def live_yield(self, provider: str) -> Optional[float]:
+        """Expected new live proxies per minute spent fetching the provider (None if never fetched)."""
+        stats = self.providers.get(provider)
+        if not stats:
+            return None
+        unique, seconds = stats[2], max(stats[3], 1.0)
+        return unique * self.source_rate(provider) / seconds * 60
+
+    def score(self, proxy: Proxy) -> float:
+        """Expected probability that the proxy is live (0..1)."""
+        prior = self.source_rate(proxy.source)
+        stats = self.proxies.get(proxy.to_url())
+        if not stats:
+            return prior
+        checks, live = stats[0], stats[1]
+        return (live + prior * SOURCE_PRIOR_WEIGHT) / (checks + SOURCE_PRIOR_WEIGHT)
+
+
+def parse_protocols(value: str) -> List[Protocol]:
+    """Parses a comma separated list like "http,socks5"."""
+    return [Protocol(v.strip().lower()) for v in value.split(",") if v.strip()]
+
+
+def prioritize(
+    proxies: Iterable[Proxy],
+    history: Optional[ProxyHistory] = None,
+    prefer: Sequence[Protocol] = (),
+) -> List[Proxy]:
+    """
+    Orders candidates so the ones most likely to be live are checked first.
+    Protocols listed in `prefer` come first (in that order); within a protocol
+    rank, proxies are sorted by their history score.
+    """
+    rank = {proto: i for i, proto in enumerate(prefer)}
+    unranked = len(rank)
+
+    def key(p: Proxy):
+        score = history.score(p) if history else 0.0
+        return (rank.get(p.protocol, unranked), -score)
+
+    return sorted(proxies, key=key)
+
+
+def plan_providers(
+    providers: Iterable[str],
+    history: Optional[ProxyHistory] = None,
+    min_yield: Optional[float] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Splits providers into (fetch, skip). Providers to fetch are ordered by
+    live yield, best first; ones never fetched before go first so they get
+    measured. With `min_yield` (live proxies per minute), providers below it
+    are skipped, except every PROVIDER_REPROBE_EVERY-th run.
+    """
+    fetch, skip = [], []
+    for name in providers:
+        value = history.live_yield(name) if history else None
+        if (
+            min_yield is not None
+            and value is not None
+            and value < min_yield
+            and history.providers[name][4] + 1 < PROVIDER_REPROBE_EVERY
+        ):
+            skip.append(name)
+        else:
+            fetch.append(name)
+
+    def key(name: str):
+        value = history.live_yield(name) if history else None
+        return -(value if value is not None else float("inf"))
+
+    return sorted(fetch, key=key), skip
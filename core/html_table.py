@@ -0,0 +1,42 @@
+import re
+from typing import Iterator, List
+
+# One token per cell (with its content) or per row/tbody boundary. Cell content
+# runs until the next table tag, so omitted </td> / </tr> end tags are fine.
+_TABLE_TOKEN = re.compile(
+    r'<t[dh](?:\s[^>]*)?>([^<]*(?:<(?!/?t[dhr][\s>]|/?tbody[\s>])[^<]*)*)'
+    r'|<(/?)(tr|tbody)[\s>]'
+)
+
+
+def iter_table_rows(html: str, tbody_only: bool = False) -> Iterator[List[str]]:
+    """
+    Yields every table row in `html` as a list of cell contents (the raw
+    inner HTML of each <td>/<th>), tokenizing the page in a single pass.
+
+    Attributes on any tag are fine (<tr class="odd">), and so are omitted
+    end tags, which HTML allows. With `tbody_only`, rows outside a <tbody>
+    (e.g. header rows) are skipped.
+    """
+    in_tbody = False
+    row = None
+
+    for m in _TABLE_TOKEN.finditer(html):
+        cell = m.group(1)
+        if cell is not None:
+            if row is not None:
+                row.append(cell)
+            continue
+
+        # <tr>, </tr>, <tbody> and </tbody> all end the current row
+        if row is not None:
+            yield row
+            row = None
+        closing, tag = m.group(2, 3)
+        if tag == "tbody":
+            in_tbody = not closing
+        elif not closing and (in_tbody or not tbody_only):
+            row = []
+
+    if row is not None:
+        yield row
@@ -0,0 +1,194 @@
+import asyncio
+import cProfile
+import heapq
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+REPORT_DIR = "output"
+REPORT_FILE = "instrument_report.txt"
+
+# The heartbeat wakes up every LAG_INTERVAL seconds; anything that keeps the
+# loop busy for longer than BLOCK_THRESHOLD gets its stack recorded
+LAG_INTERVAL = 0.05
+BLOCK_THRESHOLD = 0.1
+TOP_BLOCKS = 10
+STACK_DEPTH = 12
+PROFILE_LINES = 25
+
+# Event loop internals are on every stack; leave them out of the report
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class Instrumentation:
+    """
+    Opt-in diagnostics for a whole run: event-loop lag, the longest blocking
+    stretches with the stack that was running, and (optionally) a cProfile
+    session per phase. Everything is written to one report when the
+    `async with` block exits, including on Ctrl-C.
+
+    Only time spent inside a phase() counts, so blocking prompts in between
+    don't show up as lag.
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False,
+                 report_dir: str = REPORT_DIR, interval: float = LAG_INTERVAL,
+                 threshold: float = BLOCK_THRESHOLD, top_n: int = TOP_BLOCKS):
+        self.enabled = enabled
+        self.profile = profile
+        self.report_dir = report_dir
+        self.interval = interval
+        self.threshold = threshold
+        self.top_n = top_n
+
+        self.current: Optional[str] = None
+        self.durations: Dict[str, float] = {}
+        self.lags: Dict[str, List[float]] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        # Min-heap of (seconds, seq, phase, stack) holding the longest stalls
+        self.blocks: List[Tuple[float, int, str, Optional[List[str]]]] = []
+
+        self._beat = 0.0
+        self._captured: Optional[Tuple[float, List[str]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread = threading.get_ident()
+
+    @property
+    def report_path(self) -> str:
+        return os.path.join(self.report_dir, REPORT_FILE)
+
+    async def __aenter__(self):
+        if self.enabled:
+            self._loop_thread = threading.get_ident()
+            self._beat = time.monotonic()
+            self._task = asyncio.create_task(self._heartbeat())
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        if not self.enabled:
+            return
+        self._stop.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._watchdog.join()
+        self.write_report()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Attributes lag (and, with `profile`, a cProfile session) to `name`."""
+        if not self.enabled:
+            yield
+            return
+
+        profiler = None
+        if self.profile:
+            profiler = self.profiles.setdefault(name, cProfile.Profile())
+            profiler.enable()
+        self.current = name
+        self.lags.setdefault(name, [])
+        self._beat = time.monotonic()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Close the open interval here, so a stall right before the next
+            # phase starts is not blamed on that phase
+            self._close_interval(name)
+            self.current = None
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self.current is not None:
+                self._close_interval(self.current)
+
+    def _close_interval(self, phase: str):
+        now = time.monotonic()
+        self._record(phase, max(now - self._beat - self.interval, 0.0))
+        self._beat = now
+
+    def _record(self, phase: str, lag: float):
+        self.lags[phase].append(lag)
+        if lag < self.threshold:
+            return
+        # The watchdog grabbed the stack if it saw this stall while it lasted
+        captured = self._captured
+        stack = captured[1] if captured and captured[0] == self._beat else None
+        entry = (lag, len(self.lags[phase]), phase, stack)
+        if len(self.blocks) < self.top_n:
+            heapq.heappush(self.blocks, entry)
+        elif lag > self.blocks[0][0]:
+            heapq.heapreplace(self.blocks, entry)
+
+    def _watch(self):
+        """Runs in a thread, so it can look at the loop while the loop is stuck."""
+        seen = None
+        while not self._stop.wait(self.interval / 2):
+            beat = self._beat
+            if self.current is None or beat == seen:
+                continue
+            if time.monotonic() - beat - self.interval > self.threshold:
+                seen = beat
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    frames = [
+                        f for f in traceback.extract_stack(frame)
+                        if not f.filename.startswith(_ASYNCIO_DIR)
+                    ]
+                    self._captured = (beat, traceback.format_list(frames[-STACK_DEPTH:]))
+
+    def write_report(self):
+        os.makedirs(self.report_dir, exist_ok=True)
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            f.write(f"ProxyGod instrumentation report ({time.strftime('%Y-%m-%d %H:%M:%S')})\n\n")
+
+            f.write("Phases\n")
+            for name, seconds in self.durations.items():
+                f.write(f"  {name:<10} {seconds:9.2f} s\n")
+
+            f.write(f"\nEvent-loop lag (heartbeat every {self.interval * 1000:.0f} ms)\n")
+            f.write(f"  {'phase':<10} {'samples':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'blocked':>8}\n")
+            for name, lags in self.lags.items():
+                if not lags:
+                    continue
+                blocked = sum(1 for lag in lags if lag >= self.threshold)
+                f.write(
+                    f"  {name:<10} {len(lags):>8} {_quantile(lags, 0.5) * 1000:>8.1f} "
+                    f"{_quantile(lags, 0.99) * 1000:>8.1f} {max(lags) * 1000:>8.1f} {blocked:>8}\n"
+                )
+
+            f.write(f"\nLongest blocking stretches (>= {self.threshold * 1000:.0f} ms)\n")
+            if not self.blocks:
+                f.write("  none\n")
+            for i, (lag, _, name, stack) in enumerate(sorted(self.blocks, reverse=True), 1):
+                f.write(f"\n#{i}  {lag * 1000:.0f} ms during {name}\n")
+                if stack:
+                    f.write("".join("    " + line for line in "".join(stack).splitlines(True)))
+                else:
+                    f.write("    (stack not captured: the stall ended before the watchdog saw it)\n")
+
+            for name, profiler in self.profiles.items():
+                stats_path = os.path.join(self.report_dir, f"profile_{name}.prof")
+                profiler.dump_stats(stats_path)
+                buffer = io.StringIO()
+                pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_LINES)
+                f.write(f"\ncProfile: {name} (top {PROFILE_LINES} by cumulative time, full data in {stats_path})\n")
+                f.write(buffer.getvalue())
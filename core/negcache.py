@@ -0,0 +1,85 @@
+import json
+import os
+import random
+import time
+from typing import Dict, List
+from .models import Proxy
+
+NEG_CACHE_FILE = os.path.join("output", "negcache.json")
+
+# A host is written off after this many failed checks with no success...
+IP_DEAD_AFTER = 3
+# ...and a /24 once it has this many failures and (almost) no live proxies
+SUBNET_DEAD_AFTER = 16
+SUBNET_MAX_LIVE_RATIO = 0.02
+# Fraction of candidates in dead ranges that are still checked, so a range
+# that comes back to life is noticed
+SAMPLE_RATE = 0.1
+# Persisted statistics older than this are ignored
+NEG_CACHE_MAX_AGE = 24 * 3600
+
+
+def _subnet(ip: str) -> str:
+    return ip.rsplit(".", 1)[0]
+
+
+class NegativeCache:
+    """
+    Per-IP and per-/24 failure statistics used to stop burning full timeouts
+    on hosts and blocks that are firewalled wholesale.
+
+    Stored as JSON (optional, see load()/save()):
+      {"ips": {ip: [failures, live, last_seen]}, "subnets": {a.b.c: [failures, live, last_seen]}}
+    """
+
+    def __init__(self, path: str = NEG_CACHE_FILE, sample_rate: float = SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.ips: Dict[str, List[int]] = {}
+        self.subnets: Dict[str, List[int]] = {}
+        self.skipped = 0
+        self.random = random.Random()
+
+    def load(self) -> "NegativeCache":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            cutoff = time.time() - NEG_CACHE_MAX_AGE
+            self.ips = {k: v for k, v in data.get("ips", {}).items() if v[2] >= cutoff}
+            self.subnets = {k: v for k, v in data.get("subnets", {}).items() if v[2] >= cutoff}
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError, IndexError, TypeError):
+            self.ips, self.subnets = {}, {}
+        return self
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ips": self.ips, "subnets": self.subnets}, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, proxy: Proxy, is_live: bool):
+        now = int(time.time())
+        for table, key in ((self.ips, proxy.ip), (self.subnets, _subnet(proxy.ip))):
+            stats = table.setdefault(key, [0, 0, 0])
+            if is_live:
+                stats[1] += 1
+            else:
+                stats[0] += 1
+            stats[2] = now
+
+    def is_dead(self, proxy: Proxy) -> bool:
+        """True if the proxy's host or /24 looks saturated with dead proxies."""
+        stats = self.ips.get(proxy.ip)
+        if stats and stats[1] == 0 and stats[0] >= IP_DEAD_AFTER:
+            return True
+        stats = self.subnets.get(_subnet(proxy.ip))
+        if stats and stats[0] >= SUBNET_DEAD_AFTER:
+            return stats[1] / (stats[0] + stats[1]) < SUBNET_MAX_LIVE_RATIO
+        return False
+
+    def sample(self) -> bool:
+        """Whether to check a candidate from a dead range anyway."""
+        return self.random.random() < self.sample_rate
@@ -0,0 +1,167 @@
+import asyncio
+import random
+from typing import Dict, List, Optional
+from .models import Proxy
+from .checker import check_proxies_generator
+
+# Latency tiers (upper bound in ms) and their selection weight per proxy.
+# Weighted choice is done over a fixed number of tiers, so acquire() is O(1)
+# no matter how many proxies are in the pool.
+LATENCY_TIERS = (500.0, 1500.0, 4000.0, float("inf"))
+TIER_WEIGHTS = (8, 4, 2, 1)
+
+MAX_FAILURES = 3
+REVALIDATE_INTERVAL = 300.0
+
+
+class _Entry:
+    __slots__ = ("proxy", "latency", "tier", "index", "failures")
+
+    def __init__(self, proxy: Proxy, latency: float):
+        self.proxy = proxy
+        self.latency = latency
+        self.tier = 0
+        self.index = 0
+        self.failures = 0
+
+
+def _tier_for(latency: float) -> int:
+    for i, bound in enumerate(LATENCY_TIERS):
+        if latency <= bound:
+            return i
+    return len(LATENCY_TIERS) - 1
+
+
+class LivePool:
+    """
+    In-memory pool of live proxies for use inside an asyncio service.
+
+    acquire() picks a proxy at random, weighted toward low latency;
+    release()/report_failure() feed results back. Proxies that fail
+    `max_failures` times in a row are evicted, and a background task
+    (see start()) periodically re-checks the whole pool.
+    All bookkeeping is O(1) and never touches the disk.
+    """
+
+    def __init__(self, max_failures: int = MAX_FAILURES,
+                 revalidate_interval: float = REVALIDATE_INTERVAL,
+                 concurrency: int = 50):
+        self.max_failures = max_failures
+        self.revalidate_interval = revalidate_interval
+        self.concurrency = concurrency
+        self._entries: Dict[Proxy, _Entry] = {}
+        self._tiers: List[List[_Entry]] = [[] for _ in LATENCY_TIERS]
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, proxy: Proxy):
+        return proxy in self._entries
+
+    def proxies(self) -> List[Proxy]:
+        return list(self._entries)
+
+    def add(self, proxy: Proxy, latency: float = 0.0):
+        """Adds a live proxy, or refreshes its latency if already pooled."""
+        entry = self._entries.get(proxy)
+        if entry is None:
+            entry = self._entries[proxy] = _Entry(proxy, latency)
+            self._place(entry, _tier_for(latency))
+        else:
+            self._set_latency(entry, latency)
+            entry.failures = 0
+
+    def remove(self, proxy: Proxy):
+        entry = self._entries.pop(proxy, None)
+        if entry is not None:
+            self._unplace(entry)
+
+    def acquire(self) -> Proxy:
+        """Returns a pooled proxy. Raises LookupError when the pool is empty."""
+        weights = [len(t) * w for t, w in zip(self._tiers, TIER_WEIGHTS)]
+        total = sum(weights)
+        if total == 0:
+            raise LookupError("LivePool is empty")
+
+        pick = random.random() * total
+        for tier, weight in zip(self._tiers, weights):
+            if pick < weight:
+                break
+            pick -= weight
+        return tier[random.randrange(len(tier))].proxy
+
+    def release(self, proxy: Proxy, ok: bool = True, latency: Optional[float] = None):
+        """Returns a proxy obtained from acquire(), reporting how it went."""
+        entry = self._entries.get(proxy)
+        if entry is None:
+            return
+        if not ok:
+            self.report_failure(proxy)
+            return
+        entry.failures = 0
+        if latency is not None:
+            self._set_latency(entry, latency)
+
+    def report_failure(self, proxy: Proxy):
+        entry = self._entries.get(proxy)
+        if entry is None:
+            return
+        entry.failures += 1
+        if entry.failures >= self.max_failures:
+            self.remove(proxy)
+
+    async def revalidate(self):
+        """Re-checks every pooled proxy once, evicting the dead ones."""
+        async for proxy, is_live, latency in check_proxies_generator(
+            self.proxies(), concurrency=self.concurrency
+        ):
+            if is_live:
+                if proxy in self._entries:
+                    self.add(proxy, latency)
+            else:
+                self.remove(proxy)
+
+    def start(self):
+        """Starts background re-validation on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._revalidate_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _revalidate_loop(self):
+        while True:
+            await asyncio.sleep(self.revalidate_interval)
+            await self.revalidate()
+
+    def _set_latency(self, entry: _Entry, latency: float):
+        entry.latency = latency
+        tier = _tier_for(latency)
+        if tier != entry.tier:
+            self._unplace(entry)
+            self._place(entry, tier)
+
+    def _place(self, entry: _Entry, tier: int):
+        bucket = self._tiers[tier]
+        entry.tier = tier
+        entry.index = len(bucket)
+        bucket.append(entry)
+
+    def _unplace(self, entry: _Entry):
+        # Swap-remove keeps deletion O(1)
+        bucket = self._tiers[entry.tier]
+        last = bucket.pop()
+        if last is not entry:
+            bucket[entry.index] = last
+            last.index = entry.index
@@ -0,0 +1,143 @@
+import ipaddress
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+from .models import Proxy
+
+# Reserved, private and otherwise unroutable IPv4 space (RFC 6890 and friends).
+# Nothing in here can be a usable public proxy.
+BOGON_NETWORKS = (
+    "0.0.0.0/8",          # "this" network
+    "10.0.0.0/8",         # private
+    "100.64.0.0/10",      # carrier-grade NAT
+    "127.0.0.0/8",        # loopback
+    "169.254.0.0/16",     # link-local
+    "172.16.0.0/12",      # private
+    "192.0.0.0/24",       # IETF protocol assignments
+    "192.0.2.0/24",       # TEST-NET-1
+    "192.88.99.0/24",     # 6to4 relay anycast (deprecated)
+    "192.168.0.0/16",     # private
+    "198.18.0.0/15",      # benchmarking
+    "198.51.100.0/24",    # TEST-NET-2
+    "203.0.113.0/24",     # TEST-NET-3
+    "224.0.0.0/4",        # multicast
+    "240.0.0.0/4",        # reserved, includes broadcast
+)
+
+# Reject reasons, as reported per provider
+MALFORMED = "malformed"
+BAD_PORT = "bad port"
+BOGON = "bogon"
+BLOCKED = "blocklist"
+
+
+def ip_to_int(ip: str) -> Optional[int]:
+    """Parses a dotted-quad IPv4 address strictly; returns None if it isn't one."""
+    parts = ip.split(".")
+    if len(parts) != 4:
+        return None
+    value = 0
+    for part in parts:
+        # No signs, spaces or leading zeros ("010" is octal to some stacks)
+        # isascii() too: isdigit() accepts e.g. "²", which int() rejects
+        if not (part.isascii() and part.isdigit()) or len(part) > 3 or (len(part) > 1 and part[0] == "0"):
+            return None
+        octet = int(part)
+        if octet > 255:
+            return None
+        value = (value << 8) | octet
+    return value
+
+
+class CidrIndex:
+    """Set of IPv4 networks answering membership in O(log n) via merged, sorted ranges."""
+
+    def __init__(self, networks: Iterable[str] = ()):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self.add(networks)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def add(self, networks: Iterable[str]):
+        ranges = list(zip(self._starts, self._ends))
+        for net in networks:
+            n = ipaddress.IPv4Network(net.strip(), strict=False)
+            ranges.append((int(n.network_address), int(n.broadcast_address)))
+
+        # Merge overlapping/adjacent ranges so lookup is a single bisect
+        ranges.sort()
+        self._starts, self._ends = [], []
+        for start, end in ranges:
+            if self._ends and start <= self._ends[-1] + 1:
+                self._ends[-1] = max(self._ends[-1], end)
+            else:
+                self._starts.append(start)
+                self._ends.append(end)
+
+    def __contains__(self, ip: int) -> bool:
+        i = bisect_right(self._starts, ip) - 1
+        return i >= 0 and ip <= self._ends[i]
+
+
+def load_blocklist(path: str) -> List[str]:
+    """
+    Reads IPs / CIDRs, one per line; '#' starts a comment. IPv6 entries are
+    skipped (candidates are IPv4 only). Raises ValueError naming the file
+    and line of any other entry that isn't an IPv4 address or network.
+    """
+    networks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line or ":" in line:
+                continue
+            try:
+                ipaddress.IPv4Network(line, strict=False)
+            except ValueError:
+                raise ValueError(f"{path}:{lineno}: not an IPv4 address or CIDR: {line!r}") from None
+            networks.append(line)
+    return networks
+
+
+class CandidateValidator:
+    """
+    Drops candidates that can never work before they cost a socket:
+    malformed addresses, out-of-range ports, bogon space and anything on a
+    user-supplied blocklist. Rejections are counted per provider.
+    """
+
+    def __init__(self, blocklists: Sequence[str] = (), networks: Iterable[str] = BOGON_NETWORKS):
+        self.bogons = CidrIndex(networks)
+        self.blocked = CidrIndex()
+        for path in blocklists:
+            self.blocked.add(load_blocklist(path))
+        self.rejects: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @property
+    def total_rejected(self) -> int:
+        return sum(sum(r.values()) for r in self.rejects.values())
+
+    def reason(self, proxy: Proxy) -> Optional[str]:
+        """Returns why `proxy` is rejected, or None if it is a valid candidate."""
+        ip = ip_to_int(proxy.ip) if isinstance(proxy.ip, str) else None
+        if ip is None:
+            return MALFORMED
+        if not isinstance(proxy.port, int) or not 1 <= proxy.port <= 65535:
+            return BAD_PORT
+        if ip in self.bogons:
+            return BOGON
+        if self.blocked and ip in self.blocked:
+            return BLOCKED
+        return None
+
+    def filter(self, batch: List[Proxy], provider: Optional[str] = None) -> List[Proxy]:
+        valid = []
+        for p in batch:
+            why = self.reason(p)
+            if why is None:
+                valid.append(p)
+            else:
+                self.rejects[p.source or provider or "unknown"][why] += 1
+        return valid
@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import sys
 import os
@@ -9,6 +10,12 @@ from core.models import Proxy, Protocol
 from core.fetcher import fetch_all_proxies
 from core.checker import check_proxies_generator
 from core.exporter import export_proxies
+from core.checkpoint import Checkpoint
+from core.history import ProxyHistory, prioritize, parse_protocols
+from core.distributed import Coordinator, run_worker
+from core.validation import CandidateValidator, load_blocklist
+from core.negcache import NegativeCache
+from core.instrument import Instrumentation
 from ui.tui import Dashboard
 
 console = Console()
@@ -33,8 +40,22 @@ def get_resource_path(relative_path):
         return os.path.join(sys._MEIPASS, relative_path)
     return os.path.join(os.path.abspath("."), relative_path)
 
-async def main():
+async def main(args):
+    instrument = Instrumentation(enabled=args.instrument or args.profile, profile=args.profile)
+    async with instrument:
+        await run_scan(args, instrument)
+    if instrument.enabled:
+        console.print(f"[dim]Instrumentation report written to {instrument.report_path}[/dim]")
+
+async def run_scan(args, instrument):
     print_banner_simple()
+
+    if args.worker:
+        console.print(f"[cyan]Worker mode: checking proxies leased by {args.worker}[/cyan]")
+        with instrument.phase("check"):
+            checked = await run_worker(args.worker, concurrency=args.concurrency)
+        console.print(f"[green]Worker finished after checking {checked} proxies.[/green]")
+        return
     
     # Try to find providers.md in the bundle or local file system
     providers_path = get_resource_path(os.path.join("data", "providers.md"))
@@ -49,18 +70,54 @@ async def main():
             console.print("[bold red]ERROR: providers.md not found![/bold red]")
             return
 
-    console.print("\n[bold cyan]Setup[/bold cyan]")
-    console.print("Please visit [link=https://advanced.name/freeproxy]https://advanced.name/freeproxy[/link] for daily rotating proxies.")
-    advanced_url = console.input("[bold green]Paste the Advanced.name link here (Enter to skip): [/bold green]")
+    history = ProxyHistory().load()
+    checkpoint = Checkpoint()
+    proxies = None
+    checked = {}
+    skipped = set()
 
-    console.print()
-    # console.print()
-    # Fetcher handles its own UI now
-    proxies = await fetch_all_proxies(providers_path, advanced_url if advanced_url.strip() else None)
-        
-    console.print(f"[green]Successfully fetched {len(proxies)} unique proxies![/green]")
-    if not proxies:
-        return
+    if checkpoint.exists():
+        candidates, checked, skipped = checkpoint.load()
+        candidate_set = set(candidates)
+        checked = {p: lat for p, lat in checked.items() if p in candidate_set}
+        skipped = {p for p in skipped if p in candidate_set and p not in checked}
+        done = len(checked) + len(skipped)
+        console.print(f"\n[bold yellow]Found an interrupted scan ({done}/{len(candidates)} checked).[/bold yellow]")
+        answer = console.input("[bold green]Resume it? (Y/n): [/bold green]")
+        if answer.strip().lower() in ("", "y", "yes"):
+            proxies = candidates
+            checkpoint.resume()
+        else:
+            checked, skipped = {}, set()
+
+    if proxies is None:
+        console.print("\n[bold cyan]Setup[/bold cyan]")
+        console.print("Please visit [link=https://advanced.name/freeproxy]https://advanced.name/freeproxy[/link] for daily rotating proxies.")
+        advanced_url = console.input("[bold green]Paste the Advanced.name link here (Enter to skip): [/bold green]")
+
+        console.print()
+        # console.print()
+        # Fetcher handles its own UI now
+        validator = CandidateValidator(args.blocklist)
+        with instrument.phase("fetch"):
+            proxies = await fetch_all_proxies(
+                providers_path,
+                advanced_url if advanced_url.strip() else None,
+                validator=validator,
+                history=history,
+                min_yield=args.min_provider_yield,
+            )
+        # Keep the provider yield even if the scan is aborted later on
+        history.save()
+            
+        console.print(f"[green]Successfully fetched {len(proxies)} unique proxies![/green]")
+        if validator.total_rejected:
+            console.print(f"[yellow]Skipped {validator.total_rejected} invalid, reserved or blocklisted candidates (details in fetch_stats.txt).[/yellow]")
+        if not proxies:
+            return
+
+        # Journal every result from here on so Ctrl-C doesn't lose the scan
+        checkpoint.start(proxies)
 
     console.print("[yellow]Preparing to launch Checker Dashboard...[/yellow]")
     await asyncio.sleep(2) 
@@ -68,40 +125,160 @@ async def main():
     dashboard = Dashboard()
     dashboard.total = len(proxies)
     
-    live_proxies = []
+    # Results restored from the checkpoint count as already checked
+    live_proxies = [p for p, latency in checked.items() if latency > 0]
+    dashboard.checked = len(checked)
+    dashboard.live = len(live_proxies)
+    dashboard.dead = len(checked) - len(live_proxies)
+    dashboard.skipped = len(skipped)
     
-    with Live(dashboard.layout, refresh_per_second=10, screen=True) as live:
-        async for proxy, is_live, latency in check_proxies_generator(proxies):
-            dashboard.add_log(proxy, is_live, latency)
-            
-            if is_live:
-                dashboard.update(checked_increment=1, live_increment=1)
-                live_proxies.append(proxy)
-            else:
-                dashboard.update(checked_increment=1, dead_increment=1)
+    # Most promising candidates first: preferred protocols, then past liveness
+    pending = prioritize(
+        (p for p in proxies if p not in checked and p not in skipped),
+        history,
+        prefer=args.prefer,
+    )
+    
+    target_live = None
+    if args.target_live:
+        target_live = max(args.target_live - len(live_proxies), 0)
+        if target_live == 0:
+            pending = []
+    
+    negative_cache = NegativeCache()
+    if args.remember_dead:
+        negative_cache.load()
+    else:
+        # A resumed scan picks up the dead ranges it had already found
+        for p, latency in checked.items():
+            negative_cache.record(p, latency > 0)
+    skipped_before = len(skipped)
+    
+    if args.coordinator:
+        # Workers do the checking; results stream back here in the same shape
+        host, port = args.coordinator
+        results = Coordinator(
+            pending, target_live=target_live,
+            negative_cache=negative_cache, on_skip=checkpoint.skip,
+        ).run(host, port)
+    else:
+        results = check_proxies_generator(
+            pending, args.concurrency, target_live=target_live,
+            negative_cache=negative_cache, on_skip=checkpoint.skip,
+        )
+    
+    try:
+        with instrument.phase("check"), Live(dashboard.layout, refresh_per_second=10, screen=True) as live:
+            async for proxy, is_live, latency in results:
+                checkpoint.record(proxy, is_live, latency)
+                history.record(proxy, is_live)
+                dashboard.skipped = skipped_before + negative_cache.skipped
+                dashboard.add_log(proxy, is_live, latency)
+                
+                if is_live:
+                    dashboard.update(checked_increment=1, live_increment=1)
+                    live_proxies.append(proxy)
+                else:
+                    dashboard.update(checked_increment=1, dead_increment=1)
+            # Skips at the end of the deferred tail come after the last result
+            dashboard.skipped = skipped_before + negative_cache.skipped
+            dashboard.update()
+    finally:
+        checkpoint.close()
+        history.save()
+        if args.remember_dead:
+            negative_cache.save()
                 
     console.clear() 
     print_banner_simple()
-    console.print(Panel(f"[bold white]Scan Complete![/bold white]\n\nChecked: {len(proxies)}\nLive: [green]{len(live_proxies)}[/green]", border_style="green"))
+    console.print(Panel(f"[bold white]Scan Complete![/bold white]\n\nChecked: {dashboard.checked}\nLive: [green]{len(live_proxies)}[/green]\nSkipped (dead ranges): {dashboard.skipped}", border_style="green"))
     
     if live_proxies:
         export_proxies(live_proxies, "output")
         console.print("[bold green]Proxies exported to the 'output' folder.[/bold green]")
+        checkpoint.clear()
         
         if sys.platform == 'win32':
              os.startfile(os.path.abspath("output"))
     else:
         console.print("[red]No live proxies found. Try updating providers.[/red]")
+        checkpoint.clear()
 
     console.input("[dim]Press Enter to exit...[/dim]")
 
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def parse_blocklist(path):
+    # Checked up front, so a bad file fails before the interactive prompts
+    try:
+        load_blocklist(path)
+    except OSError as e:
+        raise argparse.ArgumentTypeError(f"can't read {path}: {e.strerror}")
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return path
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ProxyGod - The Ultimate Proxy Scraper & Checker")
+    parser.add_argument(
+        "--target-live", type=positive_int, default=None, metavar="N",
+        help="stop checking as soon as N live proxies are confirmed",
+    )
+    parser.add_argument(
+        "--prefer", type=parse_protocols, default=[], metavar="PROTOCOLS",
+        help="comma separated protocols to check first, e.g. 'http' or 'socks5,socks4'",
+    )
+    parser.add_argument(
+        "--blocklist", action="append", type=parse_blocklist, default=[], metavar="FILE",
+        help="file of IPs/CIDRs never to check, one per line (can be repeated)",
+    )
+    parser.add_argument(
+        "--min-provider-yield", type=float, default=None, metavar="N",
+        help="skip providers that found fewer than N new live proxies per minute of fetching in earlier runs",
+    )
+    parser.add_argument(
+        "--remember-dead", action="store_true",
+        help="keep dead host and /24 statistics across runs (output/negcache.json)",
+    )
+    parser.add_argument(
+        "--concurrency", type=positive_int, default=300, metavar="N",
+        help="number of proxies checked at the same time (default: 300)",
+    )
+    parser.add_argument(
+        "--instrument", action="store_true",
+        help="monitor event-loop lag and record the longest blocking calls (output/instrument_report.txt)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="like --instrument, and also run cProfile over the fetch and check phases",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--coordinator", type=parse_address, default=None, metavar="HOST:PORT",
+        help="scrape as usual, then serve the checks to --worker nodes on HOST:PORT",
+    )
+    mode.add_argument(
+        "--worker", default=None, metavar="URL",
+        help="check proxies leased by the coordinator at URL, e.g. http://10.0.0.5:8765",
+    )
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    args = parse_args()
     import warnings
     warnings.filterwarnings("ignore", category=DeprecationWarning)
     try:
         if sys.platform == 'win32':
              # Python 3.8+ on Windows defaults to ProactorEventLoop which is better
              pass 
-        asyncio.run(main())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         console.print("\n[bold red]Exiting...[/bold red]")
@@ -12,6 +12,7 @@ class Dashboard:
         self.checked = 0
         self.live = 0
         self.dead = 0
+        self.skipped = 0
         self.logs = [] 
         self.max_logs = 15
         
@@ -50,8 +51,10 @@ class Dashboard:
         table.add_row("Checked", str(self.checked))
         table.add_row("Live", f"[green]{self.live}[/green]")
         table.add_row("Dead", f"[red]{self.dead}[/red]")
+        if self.skipped:
+            table.add_row("Skipped (dead ranges)", f"[dim]{self.skipped}[/dim]")
         
-        remaining = self.total - self.checked
+        remaining = self.total - self.checked - self.skipped
         table.add_row("Remaining", str(remaining))
         
         success_rate = 0
@@ -90,13 +93,14 @@ class Dashboard:
         
         # Progress Bar Logic
         percent = 0
+        done = self.checked + self.skipped
         if self.total > 0:
-            percent = (self.checked / self.total) * 100
+            percent = (done / self.total) * 100
         bar_width = 50
         filled = int((percent / 100) * bar_width)
         bar = "█" * filled + "░" * (bar_width - filled)
         
-        footer_text = f"[bold cyan]Progress:[/bold cyan] [{bar}] {percent:.1f}% ({self.checked}/{self.total})"
+        footer_text = f"[bold cyan]Progress:[/bold cyan] [{bar}] {percent:.1f}% ({done}/{self.total})"
         self.layout["footer"].update(Panel(footer_text, border_style="white"))
         
         return self.layout